@@ -1,70 +1,39 @@
-import os
-import re
+import argparse
 import random
-import subprocess
+import re
+import sys
 
-champions = ["#1 Ægon", "#2 Agent Venom", "#3 Ant Man", "#4 Beast", "#5 Black Panther (Civil War)", "#6 Black Widow", "#7 Blade", "#8 Captain America", "#9 Captain America (Infinity War)", "#10 Captain Marvel (Classic)", "#11 Carnage", "#12 Civil Warrior", "#13 Colossus", "#14 Corvus Glaive", "#15 Cyclops (Blue Team)", "#16 Daredevil (Classic)", "#17 Deadpool", "#18 Doctor Octopus", "#19 Doctor Strange", "#20 Dormammu", "#21 Drax", "#22 Falcon", "#23 Gamora", "#24 Ghost", "#25 Ghost Rider", "#26 Green Goblin", "#27 Groot", "#28 Guillotine", "#29 Gwenpool", "#30 Hawkeye", "#31 Heimdall", "#32 Hela", "#33 Howard The Duck", "#34 Hulk", "#35 Hulk (Ragnarok)", "#36 Hulkbuster", "#37 Iceman", "#38 Iron Fist", "#39 Iron Man (Infinity War)", "#40 Joe Fixit", "#41 Killmonger", "#42 Kingpin", "#43 Korg", "#44 Loki", "#45 Luke Cage", "#46 Magneto (Marvel Now!)", "#47 Masacre", "#48 M.O.D.O.K.", "#49 Morningstar", "#50 Nebula", "#51 Phoenix", "#52 Proxima Midnight", "#53 Punisher", "#54 Red Hulk", "#55 Red Skull", "#56 Rocket Raccoon", "#57 Rogue", "#58 Scarlet Witch", "#59 Spider-Gwen", "#60 Spider-Man (Classic)", "#61 Spider-Man (Stark Enhanced)", "#62 Star-Lord", "#63 Storm", "#64 Thor (Ragnarok)", "#65 Ultron", "#66 Venom", "#67 Venompool", "#68 Vision (Age of Ultron)", "#69 War Machine", "#70 Wasp", "#71 Winter Soldier", "#72 Wolverine", "#73 Wolverine (X-23)", "#74 Yellowjacket", "#75 Yondu", "#76 Angela", "#77 Captain Marvel", "#78 Cull Obsidian", "#79 Darkhawk", "#80 Ebony Maw", "#81 Gambit", "#82 Human Torch", "#83 Invisible Woman", "#84 Juggernaut", "#85 Magik", "#86 Mister Sinister", "#87 Mysterio", "#88 Namor", "#89 Nick Fury", "#90 Ronin", "#91 Sabretooth", "#92 Sentinel", "#93 She-Hulk", "#94 Spider-Man (Stealth Suit)", "#95 Taskmaster", "#96 The Hood", "#97 Thing", "#98 Thor", "#99 Thor (Jane Foster)", "#100 Vulture"]
+import asset_encoding
+import catalog
+import quote_store
+from unlock_store import UnlockStore
 
-def parse_champion_info(champion_string):
-    match = re.match(r"#(\d+)\s+(.*)", champion_string)
-    if match:
-        number = match.group(1)
-        name = match.group(2)
-        return number, name
-    return None, None
+store = UnlockStore("unlocks.txt")
 
 def get_champion_name(card_number):
-    for champion in champions:
-        number, name = parse_champion_info(champion)
-        if number and int(number) == card_number:
-            return name
+    champion = catalog.champions.get(card_number)
+    if champion:
+        return champion.name
     return None
 
+def card_label(card_number):
+    """Card number out of the set size, e.g. 007/100"""
+    return catalog.champions.label(card_number)
+
+def get_champion_quote(card_number):
+    return quote_store.get_store().quote(card_number)
+
 def create_initial_unlocks_file():
-    if not os.path.exists("unlocks.txt"):
+    if not store.exists():
         print("Creating initial unlocks.txt file...")
-        with open("unlocks.txt", "w") as f:
-            for i in range(1, 101):
-                f.write(f"{i:03d} NO\n")
+        store.create()
         print("unlocks.txt created with all cards locked.\n")
 
 def read_current_unlocks():
-    unlocks = {}
-    try:
-        with open("unlocks.txt", "r") as f:
-            for line in f:
-                line = line.strip()
-                if line:
-                    parts = line.split()
-                    if len(parts) >= 2:
-                        card_num = parts[0]
-                        status = parts[1].upper()
-                        unlocks[card_num] = status
-    except FileNotFoundError:
-        pass
-    return unlocks
-
-def update_unlock_status(card_number_str, status="YES"):
-    lines = []
-    try:
-        with open("unlocks.txt", "r") as f:
-            lines = f.readlines()
-    except FileNotFoundError:
-        create_initial_unlocks_file()
-        with open("unlocks.txt", "r") as f:
-            lines = f.readlines()
-
-    updated = False
-    for i, line in enumerate(lines):
-        if line.strip().startswith(card_number_str):
-            lines[i] = f"{card_number_str} {status}\n"
-            updated = True
-            break
-
-    with open("unlocks.txt", "w") as f:
-        f.writelines(lines)
+    return store.statuses()
 
-    return updated
+def update_unlock_status(card_number, status="YES"):
+    return store.set_status(card_number, status)
 
 def show_shield_splash():
     """S.H.I.E.L.D. splash screen"""
@@ -157,40 +126,128 @@ def show_random_splash_screen():
     selected_splash()
 
 def get_unlock_count():
-    unlocks = read_current_unlocks()
-    count = sum(1 for status in unlocks.values() if status == "YES")
-    return count
+    return store.unlocked_count()
+
+def parse_card_list(text):
+    """Parse a card list like "001,005,010-020" into sorted card numbers
+
+    Cards and ranges may be separated by commas or whitespace. Raises
+    ValueError naming every entry that is malformed or not in the catalog.
+    """
+    numbers = set()
+    errors = []
+    for token in re.split(r"[,\s]+", text.strip()):
+        if not token:
+            continue
+        match = re.fullmatch(r"(\d+)(?:-(\d+))?", token)
+        if not match:
+            errors.append(f"'{token}' is not a card number or range")
+            continue
+        start = int(match.group(1))
+        end = int(match.group(2)) if match.group(2) else start
+        if end < start:
+            errors.append(f"'{token}' is an empty range")
+            continue
+        unknown = [n for n in range(start, end + 1) if n not in catalog.champions]
+        if unknown:
+            errors.append(f"'{token}' includes unknown card {catalog.champions.format_number(unknown[0])}")
+            continue
+        numbers.update(range(start, end + 1))
+    if errors:
+        raise ValueError("; ".join(errors))
+    return sorted(numbers)
+
+def batch_unlock(card_numbers, generate=True):
+    """Unlock several cards in one store update and one generation pass
+
+    Returns the card numbers that were newly unlocked.
+    """
+    new_cards = [n for n in card_numbers if not store.is_unlocked(n)]
+    for n in card_numbers:
+        if n not in new_cards:
+            print(f"⚠️  Card {card_label(n)} {get_champion_name(n)} is already in your collection")
+
+    if not new_cards:
+        return []
+
+    updated = store.set_many({n: "YES" for n in new_cards})
+    if updated != len(new_cards):
+        print(f"❌ ERROR: Only {updated} of {len(new_cards)} cards could be unlocked")
+    for n in new_cards:
+        print(f"🎉 Card {card_label(n)} {get_champion_name(n)} has been added to your collection!")
+        quote = get_champion_quote(n)
+        if quote:
+            print(f'   💬 "{quote}"')
+
+    if generate:
+        try:
+            import subp
+            results = subp.generate_cards(new_cards)
+            failed = [(n, error) for n, _, status, error in results if status == "failed"]
+            for n, error in failed:
+                print(f"❌ ERROR: Could not generate card {catalog.champions.format_number(n)}: {error}")
+        except Exception as e:
+            print(f"❌ ERROR: Could not generate cards: {e}")
+    return new_cards
+
+def batch_main(args):
+    """Run a non-interactive batch unlock, returns the process exit code"""
+    specs = list(args.cards)
+    if args.file:
+        with open(args.file, "r", encoding="utf-8") as f:
+            specs.append(f.read())
+    if "-" in specs:
+        specs.remove("-")
+        specs.append(sys.stdin.read())
+
+    try:
+        card_numbers = parse_card_list(",".join(specs))
+    except ValueError as e:
+        print(f"❌ ERROR: {e}")
+        return 2
+    if not card_numbers:
+        print("❌ ERROR: No cards given")
+        return 2
+
+    create_initial_unlocks_file()
+    new_cards = batch_unlock(card_numbers, generate=not args.no_generate)
+    print(f"\nUnlocked {len(new_cards)} new cards. "
+          f"Current Collection: {get_unlock_count()}/{len(catalog.champions)} cards unlocked")
+    return 0
 
 def main():
     create_initial_unlocks_file()
+    width = catalog.champions.width
+    first, last = catalog.champions.numbers()[0], catalog.champions.max_number
 
     while True:
         show_random_splash_screen()
         unlock_count = get_unlock_count()
-        print(f"Current Collection: {unlock_count}/100 cards unlocked")
+        print(f"Current Collection: {unlock_count}/{len(catalog.champions)} cards unlocked")
         print()
 
-        user_input = input("Which card have you unlocked (enter the 3 digit value, or 'quit' to exit): ").strip()
+        user_input = input(f"Which card have you unlocked (enter the {width} digit value, or 'quit' to exit): ").strip()
 
         if user_input.lower() in ['quit', 'exit', 'q']:
             print("\n🎴 Thanks for using the S.H.I.E.L.D. Card Unlock System! 🎴")
             break
 
-        if not user_input.isdigit() or len(user_input) != 3:
-            print("\n❌ ERROR: Please enter exactly 3 digits (e.g., '001', not '1')")
+        if not user_input.isdigit() or len(user_input) != width:
+            example = catalog.champions.format_number(1)
+            print(f"\n❌ ERROR: Please enter exactly {width} digits (e.g., '{example}', not '1')")
             input("\nPress Enter to continue...")
             continue
 
         card_number = int(user_input)
-        if card_number < 1 or card_number > 100:
-            print(f"\n❌ ERROR: Card number must be between 001 and 100")
+        if card_number < first or card_number > last:
+            print(f"\n❌ ERROR: Card number must be between "
+                  f"{catalog.champions.format_number(first)} and {catalog.champions.format_number(last)}")
             input("\nPress Enter to continue...")
             continue
 
-        current_unlocks = read_current_unlocks()
-        if current_unlocks.get(user_input, "NO") == "YES":
+        if store.is_unlocked(card_number):
             champion_name = get_champion_name(card_number)
-            print(f"\n⚠️  Card {user_input}/100 {champion_name} is already in your collection!")
+            print(f"\n⚠️  Card {card_label(card_number)} {champion_name} is already in your collection!")
             input("\nPress Enter to continue...")
             continue
 
@@ -200,23 +257,53 @@ def main():
             input("\nPress Enter to continue...")
             continue
 
-        success = update_unlock_status(user_input, "YES")
+        success = update_unlock_status(card_number, "YES")
 
         if success:
             print(f"\n🎉 CONGRATULATIONS! 🎉")
-            print(f"Card {user_input}/100 {champion_name} has been added to your collection!")
+            print(f"Card {card_label(card_number)} {champion_name} has been added to your collection!")
+            quote = get_champion_quote(card_number)
+            if quote:
+                print(f'\n💬 "{quote}"')
 
             try:
-                #print("\nLaunching Marvel Champions Trading Card Generator...")
-                subprocess.run(["python", "subp.py"], check=True)
+                #print("\nGenerating Marvel Champions Trading Card...")
+                import subp
+                subp.generate_cards([card_number])
             except Exception as e:
-                print(f"\n❌ ERROR: Could not run subp.py automatically: {e}")
+                print(f"\n❌ ERROR: Could not generate card {user_input}: {e}")
         else:
             print(f"\n❌ ERROR: Could not unlock card {user_input}")
 
         input("\nPress Enter to continue...")
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Unlock cards in your collection")
+    parser.add_argument("cards", nargs="*",
+                        help="cards to unlock without prompting, e.g. 001,005,010-020 ('-' reads stdin)")
+    parser.add_argument("-f", "--file", help="read the card list from a file")
+    parser.add_argument("--tui", action="store_true",
+                        help="open the full-screen collection dashboard")
+    parser.add_argument("--profile", default=asset_encoding.profile_name(),
+                        choices=sorted(asset_encoding.ENCODER_PROFILES),
+                        help="encoder profile for generated cards (same default as subp.py, so "
+                             "cards built here stay fresh for later runs)")
+    parser.add_argument("--no-generate", action="store_true",
+                        help="only record the unlocks, do not generate cards")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
+    args = parse_args()
+    # Same encoder profile as subp.py, so unlocked cards match a full build
+    asset_encoding.set_profile(args.profile)
+    if args.cards or args.file:
+        sys.exit(batch_main(args))
+    if args.tui:
+        import collection_tui
+        import subp
+        create_initial_unlocks_file()
+        collection_tui.run_dashboard(store, None if args.no_generate else subp.generate_cards)
+        sys.exit(0)
     try:
         main()
     except KeyboardInterrupt:
@@ -0,0 +1,281 @@
+"""Encoder profiles and compact, deduplicated output for card assets
+
+Secret cards are black, white and grey, and secret images are a black
+silhouette with a blurred alpha channel, yet both used to be written as
+full RGB/RGBA. save_compact() picks the smallest lossless PNG mode for
+the content (L, LA or an exact palette), compresses it with optimize=True
+and stores the bytes once in a content-addressed blob store; the output
+path is a hard link to the blob (or a copy where links are unsupported).
+
+Every renderer encodes through a named profile (see ENCODER_PROFILES),
+picked per run with set_profile() / --profile or MCOC_ENCODER_PROFILE.
+
+Re-encode existing files in place (lossless):
+
+    python asset_encoding.py compact cards_secret images_secret
+"""
+import hashlib
+import io
+import os
+import shutil
+import sys
+import threading
+
+from PIL import Image, ImageChops
+
+BLOB_DIR = ".asset_blobs"
+
+# Named encoder settings: fast for interactive unlocks, archive for the
+# smallest files, webp for lossless WebP cards. "params" go to Image.save.
+ENCODER_PROFILES = {
+    "fast": {"format": "PNG", "extension": ".png", "params": {"compress_level": 1}},
+    "balanced": {"format": "PNG", "extension": ".png", "params": {"compress_level": 6}},
+    "archive": {"format": "PNG", "extension": ".png", "params": {"compress_level": 9, "optimize": True}},
+    "webp": {"format": "WEBP", "extension": ".webp", "params": {"lossless": True, "quality": 100, "method": 4}},
+}
+
+DEFAULT_PROFILE = "balanced"
+
+CONTENT_TYPES = {"PNG": "image/png", "WEBP": "image/webp"}
+
+_profile = os.environ.get("MCOC_ENCODER_PROFILE", DEFAULT_PROFILE)
+if _profile not in ENCODER_PROFILES:
+    _profile = DEFAULT_PROFILE
+
+# Most colors an image may have to be stored as a palette PNG
+PALETTE_COLORS = 256
+
+
+def compact_mode(img):
+    """The smallest PNG mode that stores img without loss, and the converted image"""
+    if img.mode in ("1", "L", "P"):
+        return img.mode, img
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA")
+
+    rgb = img.convert("RGB")
+    r, g, b = rgb.split()
+    gray = ImageChops.difference(r, g).getbbox() is None and ImageChops.difference(g, b).getbbox() is None
+    if img.mode == "RGBA":
+        alpha = img.getchannel("A")
+        if alpha.getextrema() == (255, 255):
+            img, alpha = rgb, None
+    else:
+        alpha = None
+
+    if gray:
+        if alpha is None:
+            return "L", r
+        return "LA", Image.merge("LA", (r, alpha))
+
+    if alpha is None:
+        colors = rgb.getcolors(PALETTE_COLORS)
+        if colors:
+            palette = Image.new("P", (1, 1))
+            flat = [channel for _, color in colors for channel in color]
+            palette.putpalette(flat + [0] * (768 - len(flat)))
+            return "P", rgb.quantize(palette=palette, dither=Image.Dither.NONE)
+    return img.mode, img
+
+
+def set_profile(name):
+    """Select the encoder profile used by every renderer in this process"""
+    global _profile
+    if name not in ENCODER_PROFILES:
+        raise ValueError(f"unknown encoder profile '{name}' (choose from {', '.join(ENCODER_PROFILES)})")
+    _profile = name
+
+
+def profile_name():
+    return _profile
+
+
+def output_extension():
+    """File extension of finished cards under the current profile"""
+    return ENCODER_PROFILES[_profile]["extension"]
+
+
+def content_type():
+    return CONTENT_TYPES[ENCODER_PROFILES[_profile]["format"]]
+
+
+def encode_image(img, compact=False, keep_png=False, **params):
+    """Encode img with the current profile
+
+    compact first converts to the smallest lossless PNG mode. keep_png
+    forces PNG (with the profile's zlib settings when it has them) for
+    intermediate files that must stay PNG whatever the card format is.
+    """
+    profile = ENCODER_PROFILES[_profile]
+    image_format = "PNG" if keep_png else profile["format"]
+    if image_format == "PNG":
+        settings = profile["params"] if profile["format"] == "PNG" else ENCODER_PROFILES[DEFAULT_PROFILE]["params"]
+        if compact:
+            _, img = compact_mode(img)
+    else:
+        settings = profile["params"]
+        params.pop("dpi", None)  # WebP has no resolution field
+    buffer = io.BytesIO()
+    img.save(buffer, image_format, **settings, **params)
+    return buffer.getvalue()
+
+
+def encode_compact(img, keep_png=False, **params):
+    """Encode img as the smallest lossless image the current profile allows"""
+    return encode_image(img, compact=True, keep_png=keep_png, **params)
+
+
+def blob_path(data, blob_dir=BLOB_DIR):
+    digest = hashlib.sha256(data).hexdigest()
+    return os.path.join(blob_dir, digest[:2], digest + ".png")
+
+
+def store_bytes(data, filename, blob_dir=BLOB_DIR):
+    """Write data to filename through the content-addressed blob store
+
+    Identical outputs share one blob. The file is swapped in with
+    os.replace, so an existing link is never written through (which would
+    change every other file sharing the blob). An existing blob is checked
+    before reuse in case something else wrote through one of its links.
+    The blob the file used to share is deleted once nothing links to it.
+    """
+    blob = blob_path(data, blob_dir)
+    if not _blob_matches(blob, data):
+        _write_blob(blob, data)
+    elif _same_file(blob, filename):
+        return blob  # already linked; renaming a link over itself would leave the temp link behind
+
+    old_blob = _linked_blob(filename, blob_dir)
+    tmp_filename = _tmp_name(filename)
+    try:
+        os.link(blob, tmp_filename)
+    except FileNotFoundError:
+        # Released by another writer since it was checked: store it again
+        _write_blob(blob, data)
+        os.link(blob, tmp_filename)
+    except OSError:
+        shutil.copyfile(blob, tmp_filename)
+    os.replace(tmp_filename, filename)
+    _release_blob(old_blob)
+    return blob
+
+
+def _tmp_name(filename):
+    return f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _write_blob(blob, data):
+    os.makedirs(os.path.dirname(blob), exist_ok=True)
+    tmp_blob = _tmp_name(blob)
+    with open(tmp_blob, "wb") as f:
+        f.write(data)
+    os.replace(tmp_blob, blob)
+
+
+def _linked_blob(filename, blob_dir=BLOB_DIR):
+    """The blob an existing output is a hard link to, or None"""
+    try:
+        if os.stat(filename).st_nlink < 2:
+            return None
+        with open(filename, "rb") as f:
+            blob = blob_path(f.read(), blob_dir)
+    except OSError:
+        return None
+    return blob if _same_file(blob, filename) else None
+
+
+def _release_blob(blob):
+    """Delete a blob that no output links to any more"""
+    if blob is None:
+        return
+    try:
+        if os.stat(blob).st_nlink <= 1:
+            os.remove(blob)
+    except FileNotFoundError:
+        pass
+
+
+def _blob_matches(blob, data):
+    try:
+        with open(blob, "rb") as f:
+            return f.read(len(data) + 1) == data
+    except FileNotFoundError:
+        return False
+
+
+def _same_file(path, other):
+    try:
+        return os.path.samefile(path, other)
+    except OSError:
+        return False
+
+
+def save_image(img, filename, **params):
+    """Encode img with the current profile and write it atomically"""
+    data = encode_image(img, **params)
+    old_blob = _linked_blob(filename)
+    tmp_filename = _tmp_name(filename)
+    with open(tmp_filename, "wb") as f:
+        f.write(data)
+    os.replace(tmp_filename, filename)
+    _release_blob(old_blob)
+    return len(data)
+
+
+def save_compact(img, filename, keep_png=False, **params):
+    """Save img compactly encoded and deduplicated, returns the bytes written"""
+    data = encode_compact(img, keep_png=keep_png, **params)
+    store_bytes(data, filename)
+    return len(data)
+
+
+def prune_blobs(blob_dir=BLOB_DIR):
+    """Delete blobs no output links to any more, returns the bytes freed"""
+    freed = 0
+    for root, _, files in os.walk(blob_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            st = os.stat(path)
+            if st.st_nlink <= 1:
+                freed += st.st_size
+                os.remove(path)
+    return freed
+
+
+def compact_files(directories):
+    """Losslessly re-encode every PNG in the directories, returns (before, after) bytes"""
+    before = after = 0
+    for directory in directories:
+        for entry in sorted(os.scandir(directory), key=lambda entry: entry.name):
+            if not entry.is_file() or not entry.name.lower().endswith(".png"):
+                continue
+            size = entry.stat().st_size
+            with Image.open(entry.path) as img:
+                img.load()
+                params = {"dpi": img.info["dpi"]} if "dpi" in img.info else {}
+                data = encode_compact(img, keep_png=True, **params)
+            before += size
+            if len(data) < size:
+                store_bytes(data, entry.path)
+                after += len(data)
+            else:
+                after += size
+    return before, after
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) < 2 or argv[0] != "compact":
+        print("Usage: python asset_encoding.py compact DIRECTORY...")
+        return 2
+    if _profile == DEFAULT_PROFILE:
+        set_profile("archive")  # squeeze existing files as hard as possible
+    before, after = compact_files(argv[1:])
+    freed = prune_blobs()
+    print(f"{before / 1024 / 1024:.2f} MiB -> {after / 1024 / 1024:.2f} MiB "
+          f"({(before - after) / 1024 / 1024:.2f} MiB saved, {freed / 1024:.0f} KiB of stale blobs pruned)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
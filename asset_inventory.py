@@ -0,0 +1,138 @@
+import functools
+import os
+import re
+
+import catalog
+
+# Asset kind -> directory it lives in
+ASSET_DIRECTORIES = {
+    "image": "images",
+    "image_secret": "images_secret",
+    "card": "cards",
+    "card_secret": "cards_secret",
+}
+
+# Preferred source image extensions, best first
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+
+# Catalogs numbered at or above SHARD_THRESHOLD keep each asset kind in
+# subdirectories of SHARD_SIZE cards (cards/000/, cards/001/, ...) so no
+# directory grows past a thousand or so files. Smaller sets stay flat.
+SHARD_THRESHOLD = 2000
+SHARD_SIZE = 1000
+
+
+def is_sharded():
+    return catalog.champions.max_number >= SHARD_THRESHOLD
+
+
+def shard_name(number):
+    return f"{number // SHARD_SIZE:03d}"
+
+
+def asset_path(directory, number, filename):
+    """Where a card's asset lives: directory/filename, or its shard when sharded
+
+    The shard directory is created the first time it is used.
+    """
+    if not is_sharded():
+        return f"{directory}/{filename}"
+    shard = f"{directory}/{shard_name(number)}"
+    _ensure_directory(shard)
+    return f"{shard}/{filename}"
+
+
+@functools.lru_cache(maxsize=None)
+def _ensure_directory(path):
+    os.makedirs(path, exist_ok=True)
+
+
+class AssetInventory:
+    """In-memory index of generated and downloaded assets
+
+    Each asset directory is listed once with os.scandir and every file is
+    indexed by (card number, kind), so the generator can answer "does this
+    card exist" or "where is this card's source art" without stat calls.
+    Kinds are "image", "placeholder", "image_secret", "card" and
+    "card_secret". Keep it current with add() when writing new files.
+
+    Shard subdirectories are scanned too. Passing `numbers` limits the scan
+    to the shards holding those cards, so looking at a few cards costs the
+    same however large the catalog is.
+    """
+
+    def __init__(self, directories=None, numbers=None):
+        self.directories = directories or ASSET_DIRECTORIES
+        self.assets = {}
+        self.shards = None if numbers is None else {shard_name(number) for number in numbers}
+        self.scan()
+
+    def scan(self):
+        self.assets = {}
+        for kind, directory in self.directories.items():
+            self._scan_directory(kind, directory, shard_level=True)
+
+    def _scan_directory(self, kind, directory, shard_level=False):
+        try:
+            entries = list(os.scandir(directory))
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            if shard_level and entry.name.isdigit() and entry.is_dir():
+                if self.shards is None or entry.name in self.shards:
+                    self._scan_directory(kind, f"{directory}/{entry.name}")
+                continue
+            if not entry.is_file() or entry.name.endswith(".tmp"):
+                continue
+            number = card_number_for_file(entry.name)
+            if number is None:
+                continue
+            file_kind = kind
+            if kind == "image" and entry.name.endswith("_placeholder.png"):
+                file_kind = "placeholder"
+            self.add(number, file_kind, os.path.join(directory, entry.name).replace(os.sep, "/"))
+
+    def add(self, number, kind, path):
+        """Record a file, keeping the preferred one first for each key"""
+        paths = self.assets.setdefault((number, kind), [])
+        if path not in paths:
+            paths.append(path)
+            paths.sort(key=_preference)
+
+    def remove(self, number, kind, path):
+        paths = self.assets.get((number, kind), [])
+        if path in paths:
+            paths.remove(path)
+
+    def get(self, number, kind):
+        paths = self.assets.get((number, kind))
+        return paths[0] if paths else None
+
+    def has(self, number, kind):
+        return bool(self.assets.get((number, kind)))
+
+    def contains(self, number, kind, path):
+        return path in self.assets.get((number, kind), ())
+
+    def source_image(self, number):
+        """Best source art for a card: a downloaded image, else its placeholder"""
+        return self.get(number, "image") or self.get(number, "placeholder")
+
+
+def card_number_for_file(filename):
+    """Card number an asset file name belongs to, or None"""
+    match = re.match(r"(\d+)_", filename)
+    if match:
+        return int(match.group(1))
+    # Older downloads were saved without the number prefix
+    stem = os.path.splitext(filename)[0]
+    if stem.endswith("_placeholder"):
+        stem = stem[:-len("_placeholder")]
+    champion = catalog.champions.find_by_file_name(stem)
+    return champion.number if champion else None
+
+
+def _preference(path):
+    ext = os.path.splitext(path)[1].lower()
+    rank = IMAGE_EXTENSIONS.index(ext) if ext in IMAGE_EXTENSIONS else len(IMAGE_EXTENSIONS)
+    return (rank, path)
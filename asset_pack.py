@@ -0,0 +1,186 @@
+"""Offline asset pack: source artwork in a single indexed, memory-mapped zip
+
+Build a pack from an existing images/ directory:
+
+    python asset_pack.py build [images_dir] [pack_file]
+
+and generate cards from it without touching the network:
+
+    python subp.py --offline assets.pack
+"""
+import argparse
+import functools
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import zipfile
+
+import catalog
+from asset_inventory import AssetInventory
+
+DEFAULT_PACK_FILE = "assets.pack"
+
+# Prefix of source references that point into a pack instead of images/
+PACK_REF_PREFIX = "pack:"
+
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+
+
+class MmapSlice:
+    """Read-only, seekable file object over a slice of a memory map
+
+    Lets PIL read a stored zip member straight from the mapped pack without
+    first copying the whole member into a bytes object.
+    """
+
+    def __init__(self, view):
+        self.view = view
+        self.position = 0
+
+    def read(self, size=-1):
+        end = len(self.view) if size is None or size < 0 else min(len(self.view), self.position + size)
+        data = self.view[self.position:end].tobytes()
+        self.position = end
+        return data
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_CUR:
+            offset += self.position
+        elif whence == os.SEEK_END:
+            offset += len(self.view)
+        self.position = max(0, offset)
+        return self.position
+
+    def tell(self):
+        return self.position
+
+    def seekable(self):
+        return True
+
+    def readable(self):
+        return True
+
+    def close(self):
+        pass
+
+
+class AssetPack:
+    """Memory-mapped zip of source images indexed by card number
+
+    The zip's central directory is read once when the pack is opened and
+    turned into a card number -> (offset, size) index of the stored member
+    data, so looking up and reading a card's art is a dict lookup and a
+    slice of the memory map.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._hashes = {}
+        self.members = {}
+        self.index = {}
+        with zipfile.ZipFile(self._file) as archive:
+            for info in archive.infolist():
+                if info.compress_type != zipfile.ZIP_STORED or info.is_dir():
+                    continue
+                number = _member_number(info.filename)
+                if number is None:
+                    continue
+                header = _LOCAL_HEADER.unpack_from(self._map, info.header_offset)
+                name_length, extra_length = header[-2], header[-1]
+                offset = info.header_offset + _LOCAL_HEADER.size + name_length + extra_length
+                self.index[number] = (offset, info.file_size)
+                self.members[number] = info.filename
+
+    def __contains__(self, number):
+        return number in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def numbers(self):
+        return sorted(self.index)
+
+    def ref(self, number):
+        """Source reference for a card, usable wherever an image path is"""
+        return f"{PACK_REF_PREFIX}{self.path}:{number}"
+
+    def view(self, number):
+        """memoryview of a card's stored image bytes"""
+        offset, size = self.index[number]
+        return memoryview(self._map)[offset:offset + size]
+
+    def open(self, number):
+        """File object for a card's image, for passing to Image.open"""
+        return MmapSlice(self.view(number))
+
+    def member_hash(self, number):
+        digest = self._hashes.get(number)
+        if digest is None:
+            digest = hashlib.sha256(self.view(number)).hexdigest()
+            self._hashes[number] = digest
+        return digest
+
+
+@functools.lru_cache(maxsize=None)
+def open_pack(path):
+    """Open a pack once per process"""
+    return AssetPack(path)
+
+
+def is_pack_ref(source):
+    return isinstance(source, str) and source.startswith(PACK_REF_PREFIX)
+
+
+def parse_pack_ref(source):
+    """Split a pack reference into (pack path, card number)"""
+    path, number = source[len(PACK_REF_PREFIX):].rsplit(":", 1)
+    return path, int(number)
+
+
+def build_pack(images_dir="images", pack_path=DEFAULT_PACK_FILE):
+    """Write the best source image for every card in images_dir to a pack"""
+    inventory = AssetInventory({"image": images_dir})
+    numbers = sorted({number for number, _ in inventory.assets})
+    tmp_path = f"{pack_path}.{os.getpid()}.tmp"
+    count = 0
+    with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_STORED) as archive:
+        for number in numbers:
+            source = inventory.source_image(number)
+            if source:
+                archive.write(source, os.path.basename(source))
+                count += 1
+    os.replace(tmp_path, pack_path)
+    return count
+
+
+def _member_number(filename):
+    name = os.path.basename(filename)
+    digits = name.split("_", 1)[0]
+    return int(digits) if digits.isdigit() else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or inspect an offline asset pack")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="pack the images directory")
+    build.add_argument("images_dir", nargs="?", default="images")
+    build.add_argument("pack", nargs="?", default=DEFAULT_PACK_FILE)
+    show = commands.add_parser("list", help="list the cards in a pack")
+    show.add_argument("pack", nargs="?", default=DEFAULT_PACK_FILE)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        count = build_pack(args.images_dir, args.pack)
+        print(f"Packed {count} images into {args.pack}")
+    else:
+        pack = open_pack(args.pack)
+        for number in pack.numbers():
+            print(f"{catalog.champions.format_number(number)} {pack.members[number]} ({pack.index[number][1]} bytes)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
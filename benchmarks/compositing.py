@@ -0,0 +1,77 @@
+"""Compare full-frame and region-only compositing of the character image
+
+Usage: python benchmarks/compositing.py [image.png] [--rounds N]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageChops, ImageDraw
+
+import subp
+
+
+def sample_image():
+    """A 512x512 RGBA test image with soft edges, like the upscaled artwork"""
+    img = Image.new('RGBA', (512, 512), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    for i in range(0, 256, 8):
+        draw.ellipse([i, i, 511 - i, 511 - i], fill=(200, 40, i, i))
+    return img
+
+
+def full_frame(card, char_image, position):
+    """The previous approach: convert and composite the whole card"""
+    card_rgba = card.convert('RGBA')
+    card_rgba.paste(char_image, position, char_image)
+    result = Image.alpha_composite(Image.new('RGBA', card_rgba.size, 'white'), card_rgba).convert('RGB')
+    # card RGBA copy, white RGBA frame, composite result, final RGB frame
+    allocated = card.width * card.height * (4 + 4 + 4 + 3)
+    return result, allocated
+
+
+def region_only(card, char_image, position):
+    subp.composite_onto_card(card, char_image, position)
+    # cropped region (RGB, then RGBA), white RGBA region, composite result, RGB region
+    allocated = char_image.width * char_image.height * (3 + 4 + 4 + 4 + 3)
+    return card, allocated
+
+
+def bench(func, char_image, position, rounds):
+    allocated = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        card = subp.card_template().copy()
+        result, allocated = func(card, char_image, position)
+    elapsed = (time.perf_counter() - start) / rounds
+    return result, elapsed, allocated
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("image", nargs="?", help="RGBA image to paste (default: generated)")
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    if args.image:
+        char_image = Image.open(args.image).convert('RGBA')
+        char_image = char_image.resize((char_image.width * 2, char_image.height * 2), Image.Resampling.LANCZOS)
+    else:
+        char_image = sample_image()
+    position = ((subp.CARD_WIDTH - char_image.width) // 2, 200)
+
+    old, old_time, old_bytes = bench(full_frame, char_image, position, args.rounds)
+    new, new_time, new_bytes = bench(region_only, char_image, position, args.rounds)
+
+    identical = ImageChops.difference(old, new).getbbox() is None
+    print(f"character image: {char_image.width}x{char_image.height}, {args.rounds} rounds")
+    print(f"full frame:  {old_time * 1000:7.2f} ms/card  {old_bytes / 1024 / 1024:6.2f} MiB allocated")
+    print(f"region only: {new_time * 1000:7.2f} ms/card  {new_bytes / 1024 / 1024:6.2f} MiB allocated")
+    print(f"speedup: {old_time / new_time:.2f}x, pixel-identical: {identical}")
+
+
+if __name__ == "__main__":
+    main()
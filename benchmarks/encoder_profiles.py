@@ -0,0 +1,68 @@
+"""Encode time and file size of each encoder profile over the card set
+
+Decodes the finished cards in cards/ and cards_secret/ (whichever exist)
+and re-encodes every one with each profile the way the renderers do:
+normal cards as-is, secret cards through the compact encoder.
+
+Usage: python benchmarks/encoder_profiles.py [--dirs cards cards_secret] [--limit N]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+import asset_encoding
+
+
+def load_cards(directories, limit=None):
+    """(image, is_secret) for every decoded card file"""
+    cards = []
+    for directory in directories:
+        if not os.path.isdir(directory):
+            continue
+        names = sorted(name for name in os.listdir(directory) if name.lower().endswith((".png", ".webp")))
+        for name in names[:limit]:
+            with Image.open(os.path.join(directory, name)) as img:
+                cards.append((img.convert("RGB"), "secret" in name))
+    return cards
+
+
+def bench_profile(name, cards):
+    asset_encoding.set_profile(name)
+    total_bytes = 0
+    start = time.perf_counter()
+    for img, secret in cards:
+        if secret:
+            data = asset_encoding.encode_compact(img, dpi=(300, 300))
+        else:
+            data = asset_encoding.encode_image(img, dpi=(300, 300))
+        total_bytes += len(data)
+    return time.perf_counter() - start, total_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dirs", nargs="+", default=["cards", "cards_secret"])
+    parser.add_argument("--limit", type=int, default=None, help="cards per directory")
+    parser.add_argument("--profiles", nargs="+", default=list(asset_encoding.ENCODER_PROFILES))
+    args = parser.parse_args()
+
+    cards = load_cards(args.dirs, args.limit)
+    if not cards:
+        print(f"No card images found in {', '.join(args.dirs)}")
+        return
+    secret = sum(1 for _, is_secret in cards if is_secret)
+    print(f"{len(cards)} cards ({len(cards) - secret} normal, {secret} secret)")
+    print(f"{'profile':10} {'ms/card':>9} {'total MiB':>10} {'KiB/card':>9}")
+    for name in args.profiles:
+        elapsed, total_bytes = bench_profile(name, cards)
+        print(f"{name:10} {elapsed / len(cards) * 1000:9.1f} {total_bytes / 1024 / 1024:10.2f} "
+              f"{total_bytes / len(cards) / 1024:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
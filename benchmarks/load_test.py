@@ -0,0 +1,90 @@
+"""Load test the card server: request throughput and latency percentiles
+
+Start the server first (python card_server.py), then:
+
+Usage: python benchmarks/load_test.py [--url http://127.0.0.1:8080]
+           [--concurrency 32] [--duration 10] [--path /cards/001.png?variant=secret ...]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import catalog
+
+DEFAULT_PATHS = ["/collection"] + [f"/cards/{catalog.champions.format_number(n)}.png?variant=secret"
+                                   for n in catalog.champions.numbers()]
+
+
+async def fetch(reader, writer, host, path):
+    """Send one keep-alive GET and read the response, returns the status code"""
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode("latin-1"))
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ", 2)[1])
+    length = 0
+    for line in lines[1:]:
+        if line.lower().startswith("content-length:"):
+            length = int(line.split(":", 1)[1])
+    await reader.readexactly(length)
+    return status
+
+
+async def client(host, port, paths, deadline, latencies, statuses):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            path = random.choice(paths)
+            start = time.perf_counter()
+            status = await fetch(reader, writer, host, path)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run(url, concurrency, duration, paths):
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    latencies, statuses = [], {}
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(client(host, port, paths, deadline, latencies, statuses)
+                           for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"{len(latencies)} requests in {elapsed:.1f}s with {concurrency} connections")
+    print(f"throughput: {len(latencies) / elapsed:8.1f} req/s")
+    for label, fraction in (("p50", 0.50), ("p90", 0.90), ("p99", 0.99)):
+        print(f"latency {label}: {percentile(latencies, fraction) * 1000:7.2f} ms")
+    print(f"latency max: {latencies[-1] * 1000 if latencies else 0:7.2f} ms")
+    print("status codes: " + ", ".join(f"{code}: {count}" for code, count in sorted(statuses.items())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--path", action="append", dest="paths",
+                        help="request path to hit (repeatable, default: collection and secret cards)")
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.concurrency, args.duration, args.paths or DEFAULT_PATHS))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Report the size and encode-time tradeoff of compact secret asset encoding
+
+Decodes every secret card and secret image and encodes it both the old way
+(full RGB/RGBA PNG, default compression) and with asset_encoding
+(smallest lossless mode, optimize=True), then counts what the
+content-addressed blob store saves on top by storing duplicates once.
+
+Usage: python benchmarks/secret_assets.py [--cards cards_secret] [--images images_secret]
+"""
+import argparse
+import hashlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+import asset_encoding
+
+
+def encode_baseline(img, mode, **params):
+    buffer = io.BytesIO()
+    img.convert(mode).save(buffer, "PNG", **params)
+    return buffer.getvalue()
+
+
+def measure(directory, baseline_mode):
+    """Totals for one directory: files, bytes and seconds for both encoders"""
+    totals = {"files": 0, "baseline_bytes": 0, "baseline_time": 0.0, "compact_bytes": 0,
+              "compact_time": 0.0, "unique_bytes": 0, "modes": {}}
+    blobs = set()
+    for entry in sorted(os.scandir(directory), key=lambda entry: entry.name):
+        if not entry.name.lower().endswith(".png"):
+            continue
+        with Image.open(entry.path) as img:
+            img.load()
+        params = {"dpi": (300, 300)} if baseline_mode == "RGB" else {}
+
+        start = time.perf_counter()
+        baseline = encode_baseline(img, baseline_mode, **params)
+        totals["baseline_time"] += time.perf_counter() - start
+
+        source = img.convert(baseline_mode)
+        start = time.perf_counter()
+        compact = asset_encoding.encode_compact(source, **params)
+        totals["compact_time"] += time.perf_counter() - start
+
+        mode, _ = asset_encoding.compact_mode(source)
+        totals["modes"][mode] = totals["modes"].get(mode, 0) + 1
+        totals["files"] += 1
+        totals["baseline_bytes"] += len(baseline)
+        totals["compact_bytes"] += len(compact)
+        digest = hashlib.sha256(compact).hexdigest()
+        if digest not in blobs:
+            blobs.add(digest)
+            totals["unique_bytes"] += len(compact)
+    totals["unique_files"] = len(blobs)
+    return totals
+
+
+def report(label, totals):
+    mib = 1024 * 1024
+    files = max(totals["files"], 1)
+    baseline, compact, unique = totals["baseline_bytes"], totals["compact_bytes"], totals["unique_bytes"]
+    modes = ", ".join(f"{count} {mode}" for mode, count in sorted(totals["modes"].items()))
+    print(f"{label}: {totals['files']} files ({modes})")
+    print(f"  baseline:     {baseline / mib:7.2f} MiB  {totals['baseline_time'] / files * 1000:6.1f} ms/file")
+    print(f"  compact:      {compact / mib:7.2f} MiB  {totals['compact_time'] / files * 1000:6.1f} ms/file"
+          f"  ({(1 - compact / baseline) * 100 if baseline else 0:.1f}% smaller)")
+    print(f"  deduplicated: {unique / mib:7.2f} MiB  {totals['unique_files']} unique blobs"
+          f"  ({(1 - unique / baseline) * 100 if baseline else 0:.1f}% smaller overall)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", default="cards_secret")
+    parser.add_argument("--images", default="images_secret")
+    args = parser.parse_args()
+
+    all_totals = []
+    for label, directory, mode in (("secret cards", args.cards, "RGB"), ("secret images", args.images, "RGBA")):
+        if os.path.isdir(directory):
+            totals = measure(directory, mode)
+            report(label, totals)
+            all_totals.append(totals)
+
+    baseline = sum(t["baseline_bytes"] for t in all_totals)
+    unique = sum(t["unique_bytes"] for t in all_totals)
+    extra = sum(t["compact_time"] - t["baseline_time"] for t in all_totals)
+    print(f"total: {baseline / 1024 / 1024:.2f} MiB -> {unique / 1024 / 1024:.2f} MiB, "
+          f"{(baseline - unique) / 1024 / 1024:.2f} MiB saved for {extra:+.1f}s of encode time")
+
+
+if __name__ == "__main__":
+    main()
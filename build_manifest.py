@@ -0,0 +1,102 @@
+import hashlib
+import json
+import os
+import re
+
+DEFAULT_MANIFEST_FILE = "build_manifest.json"
+
+# Paths inside a numbered shard directory (cards/012/...) are kept in that
+# shard's own manifest file
+_SHARD_PATH = re.compile(r"(?:^|/)(\d+)/[^/]+$")
+
+
+class BuildManifest:
+    """Record of the inputs each generated card was built from
+
+    For every output file the manifest stores a dict of input hashes and
+    parameters (source image, renderer version, font file, layout settings).
+    An output is fresh when it exists and was built from exactly the inputs
+    it would be built from now. File hashes are cached by size and mtime, so
+    a no-op check only stats files instead of re-reading them.
+
+    Entries for sharded asset paths live in one file per shard
+    (build_manifest.012.json), loaded on first use and only rewritten when
+    changed, so building a few cards of a large catalog stays cheap.
+    """
+
+    def __init__(self, filename=DEFAULT_MANIFEST_FILE):
+        self.filename = filename
+        self.partitions = {}
+        self._dirty = set()
+
+    def file_hash(self, path):
+        """sha256 of a file's contents (None if the file does not exist)"""
+        if not path:
+            return None
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        key = self._partition_key(path)
+        files = self._partition(key)["files"]
+        cached = files.get(path)
+        if cached and cached["size"] == st.st_size and cached["mtime_ns"] == st.st_mtime_ns:
+            return cached["sha256"]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                digest.update(chunk)
+        files[path] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest.hexdigest()}
+        self._dirty.add(key)
+        return digest.hexdigest()
+
+    def matches(self, output_path, inputs):
+        """True if output_path was last built from these inputs"""
+        return self._outputs(output_path).get(output_path) == inputs
+
+    def is_fresh(self, output_path, inputs):
+        """True if output_path exists and was built from these inputs"""
+        return self.matches(output_path, inputs) and os.path.exists(output_path)
+
+    def record(self, output_path, inputs):
+        self._outputs(output_path)[output_path] = inputs
+        self._dirty.add(self._partition_key(output_path))
+
+    def forget(self, output_path):
+        if self._outputs(output_path).pop(output_path, None) is not None:
+            self._dirty.add(self._partition_key(output_path))
+
+    def save(self):
+        for key in sorted(self._dirty):
+            filename = self._partition_filename(key)
+            tmp_filename = f"{filename}.{os.getpid()}.tmp"
+            with open(tmp_filename, "w") as f:
+                json.dump(self.partitions[key], f, indent=1, sort_keys=True)
+            os.replace(tmp_filename, filename)
+        self._dirty.clear()
+
+    def _outputs(self, path):
+        return self._partition(self._partition_key(path))["outputs"]
+
+    def _partition_key(self, path):
+        match = _SHARD_PATH.search(path.replace(os.sep, "/"))
+        return match.group(1) if match else ""
+
+    def _partition_filename(self, key):
+        if not key:
+            return self.filename
+        stem, ext = os.path.splitext(self.filename)
+        return f"{stem}.{key}{ext}"
+
+    def _partition(self, key):
+        partition = self.partitions.get(key)
+        if partition is None:
+            try:
+                with open(self._partition_filename(key), "r") as f:
+                    data = json.load(f)
+            except (FileNotFoundError, ValueError):
+                data = {}
+            partition = {"outputs": data.get("outputs", {}), "files": data.get("files", {})}
+            self.partitions[key] = partition
+        return partition
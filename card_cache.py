@@ -0,0 +1,75 @@
+import os
+import threading
+from collections import OrderedDict
+
+# Default memory budget for rendered cards, overridable with MCOC_CARD_CACHE_MB
+DEFAULT_MAX_BYTES = int(float(os.environ.get("MCOC_CARD_CACHE_MB", "64")) * 1024 * 1024)
+
+
+class CardCache:
+    """Byte-bounded LRU cache of encoded card images
+
+    Keys are (card number, variant, renderer version) so a renderer change
+    never serves stale bytes. The cache holds at most max_bytes of values;
+    adding a card evicts the least recently used ones until it fits. Safe to
+    share between threads.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self.entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key, data):
+        """Store a value; values larger than the whole budget are not cached"""
+        with self._lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.bytes -= len(old)
+            if len(data) > self.max_bytes:
+                return False
+            self.entries[key] = data
+            self.bytes += len(data)
+            while self.bytes > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.bytes -= len(evicted)
+                self.evictions += 1
+            return True
+
+    def invalidate(self, card_number):
+        """Drop every cached variant of a card"""
+        with self._lock:
+            for key in [key for key in self.entries if key[0] == card_number]:
+                self.bytes -= len(self.entries.pop(key))
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self.entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+            }
@@ -0,0 +1,397 @@
+"""Local HTTP API for the card collection
+
+    python card_server.py [--host 127.0.0.1] [--port 8080] [--workers N]
+
+    GET  /collection              unlocked cards and counts (JSON)
+    GET  /cards/NNN               one card's status (JSON)
+    POST /cards/NNN/unlock        unlock a card and render it
+    GET  /cards/NNN.png           the card image (unlocked cards only; .webp also
+                                  accepted, the format follows --profile)
+    GET  /cards/NNN.png?variant=secret
+                                  the redacted card, available for every card
+    GET  /metrics                 request, render and card cache counters (JSON)
+
+With --on-demand, cards are rendered in memory instead of being written
+to cards/ and cards_secret/, and the PNG bytes are kept in a byte-bounded
+LRU cache so hot cards are served without touching the disk.
+
+Built on asyncio streams only, so it needs nothing beyond the generator's
+own dependencies.
+"""
+import argparse
+import asyncio
+import functools
+import json
+import os
+import re
+import sys
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import asset_encoding
+import catalog
+import subp
+from card_cache import CardCache
+from unlock_store import UnlockStore
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 64 * 1024
+
+REASONS = {200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+CARD_PATH = re.compile(r"^/cards/(\d+)(\.png|\.webp|/unlock)?$")
+
+
+class HttpError(Exception):
+    def __init__(self, status, message=None):
+        super().__init__(message or REASONS.get(status, ""))
+        self.status = status
+
+
+class RenderQueue:
+    """Single-flight card rendering off the event loop
+
+    Every card number has at most one render in flight: later requests for
+    the same card await the same future. A secret-only render (for locked
+    cards) is a separate request that never builds the normal card.
+    Waiting cards are collected into a batch and handed to
+    subp.generate_cards on a thread, which spreads the batch over the
+    server's render processes. Only one batch runs at a time, so the build
+    manifest has a single writer.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = None
+        self.inflight = {}
+        self.queue = asyncio.Queue()
+        self.renders = 0
+        self.coalesced = 0
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def render(self, card_number, secret_only=False):
+        """Render a card (or join the render already in flight), returns an error or None"""
+        key = (card_number, secret_only)
+        future = self.inflight.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self.inflight[key] = future
+            self.queue.put_nowait(key)
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(future)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            while not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            errors = {}
+            for secret_only in (False, True):
+                numbers = [number for number, secret in batch if secret == secret_only]
+                if not numbers:
+                    continue
+                try:
+                    results = await loop.run_in_executor(None, functools.partial(
+                        subp.generate_cards, numbers, self.workers, executor=self.executor,
+                        secret_only=secret_only))
+                    errors.update(((number, secret_only), error)
+                                  for number, _, status, error in results if status == "failed")
+                    # Cards skipped as fresh did no render work
+                    self.renders += sum(1 for _, _, status, _ in results if status == "generated")
+                except Exception as e:
+                    errors.update(((number, secret_only), str(e)) for number in numbers)
+            for key in batch:
+                future = self.inflight.pop(key)
+                if not future.done():
+                    future.set_result(errors.get(key))
+
+
+class CardServer:
+    def __init__(self, store, workers=None, on_demand=False, cache_bytes=None, offline=None):
+        self.store = store
+        self.renderer = RenderQueue(workers)
+        self.requests = 0
+        self.offline = offline
+        # Render-on-demand: bytes come from a process pool into the card cache
+        self.on_demand = on_demand
+        self.cache = CardCache(cache_bytes) if cache_bytes else CardCache()
+        self.executor = None
+        self.inflight = {}
+        self.coalesced = 0
+        self.renders = 0
+
+    # -- routes ---------------------------------------------------------------
+
+    def collection(self):
+        unlocked = sorted(self.store.unlocked_numbers())
+        return {"unlocked": [catalog.champions.format_number(n) for n in unlocked], "count": len(unlocked), "total": len(catalog.champions)}
+
+    def card_status(self, card_number):
+        champion = self.champion(card_number)
+        unlocked = self.store.is_unlocked(card_number)
+        return {"number": catalog.champions.format_number(card_number), "unlocked": unlocked,
+                "name": champion.name if unlocked else champion.redacted_name}
+
+    async def unlock(self, card_number):
+        champion = self.champion(card_number)
+        card_num = catalog.champions.format_number(card_number)
+        newly_unlocked = False
+        if not self.store.is_unlocked(card_number):
+            if not self.store.set_status(card_number, "YES"):
+                raise HttpError(500, f"could not unlock card {card_num}")
+            newly_unlocked = True
+        error = None if self.on_demand else await self.renderer.render(card_number)
+        return {"number": card_num, "name": champion.name, "unlocked": True,
+                "newly_unlocked": newly_unlocked, "quote": champion.quote, "render_error": error}
+
+    async def card_image(self, card_number, variant):
+        champion = self.champion(card_number)
+        if variant == "normal" and not self.store.is_unlocked(card_number):
+            raise HttpError(403, f"card {catalog.champions.format_number(card_number)} is locked")
+        if variant not in ("normal", "secret"):
+            raise HttpError(400, f"unknown variant '{variant}'")
+        if self.on_demand:
+            return await self.card_bytes(card_number, variant)
+
+        if variant == "secret":
+            filename = subp.secret_card_filename(card_number)
+        else:
+            filename = subp.card_filename(card_number, champion.name)
+
+        if not os.path.exists(filename):
+            # A locked card's secret request must not build (or fetch for) its normal card
+            error = await self.renderer.render(card_number, secret_only=variant == "secret")
+            if error or not os.path.exists(filename):
+                raise HttpError(500, error or f"card {catalog.champions.format_number(card_number)} could not be rendered")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, read_file, filename)
+
+    async def card_bytes(self, card_number, variant):
+        """PNG bytes from the card cache, rendering (single-flight) on a miss"""
+        key = (card_number, variant, subp.CARD_RENDERER_VERSION)
+        data = self.cache.get(key)
+        if data is not None:
+            return data
+        future = self.inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.inflight[key] = future
+        try:
+            data = await loop.run_in_executor(self.executor, subp.render_card_bytes,
+                                              card_number, variant == "secret")
+        except Exception as e:
+            error = HttpError(500, f"card {catalog.champions.format_number(card_number)} "
+                                   f"could not be rendered: {e}")
+            future.set_exception(error)
+            future.exception()  # retrieved here, waiters still see it
+            raise error
+        except asyncio.CancelledError:
+            # The owning request went away; fail the waiters instead of leaving them hanging
+            future.set_exception(HttpError(500, f"render of card "
+                                                f"{catalog.champions.format_number(card_number)} was cancelled"))
+            future.exception()
+            raise
+        finally:
+            del self.inflight[key]
+        self.renders += 1
+        self.cache.put(key, data)
+        future.set_result(data)
+        return data
+
+    def metrics(self):
+        return {
+            "requests": self.requests,
+            "renders": self.renderer.renders + self.renders,
+            "coalesced": self.renderer.coalesced + self.coalesced,
+            "on_demand": self.on_demand,
+            "card_cache": self.cache.stats(),
+        }
+
+    def champion(self, card_number):
+        champion = catalog.champions.get(card_number)
+        if not champion:
+            raise HttpError(404, f"no card {card_number}")
+        return champion
+
+    async def dispatch(self, method, target):
+        url = urlsplit(target)
+        if url.path == "/collection":
+            if method != "GET":
+                raise HttpError(405)
+            return 200, "application/json", self.collection()
+        if url.path == "/metrics":
+            if method != "GET":
+                raise HttpError(405)
+            return 200, "application/json", self.metrics()
+        match = CARD_PATH.match(url.path)
+        if not match:
+            raise HttpError(404)
+        card_number, suffix = int(match.group(1)), match.group(2)
+        if suffix == "/unlock":
+            if method != "POST":
+                raise HttpError(405)
+            return 200, "application/json", await self.unlock(card_number)
+        if method != "GET":
+            raise HttpError(405)
+        if suffix in (".png", ".webp"):
+            variant = parse_qs(url.query).get("variant", ["normal"])[0]
+            return 200, asset_encoding.content_type(), await self.card_image(card_number, variant)
+        return 200, "application/json", self.card_status(card_number)
+
+    # -- HTTP/1.1 plumbing ----------------------------------------------------
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self.respond(writer, 413, "application/json", {"error": "headers too large"}, False)
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    await self.respond(writer, 400, "application/json", {"error": "bad request line"}, False)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        key, value = line.split(":", 1)
+                        headers[key.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self.respond(writer, 400, "application/json", {"error": "bad content-length"}, False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self.respond(writer, 413, "application/json", {"error": "body too large"}, False)
+                    break
+                if length:
+                    await reader.readexactly(length)
+                keep_alive = (headers.get("connection", "").lower() != "close" and version == "HTTP/1.1")
+
+                self.requests += 1
+                try:
+                    status, content_type, body = await self.dispatch(method, target)
+                except HttpError as e:
+                    status, content_type, body = e.status, "application/json", {"error": str(e)}
+                except Exception as e:
+                    status, content_type, body = 500, "application/json", {"error": str(e)}
+                await self.respond(writer, status, content_type, body, keep_alive)
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def respond(self, writer, status, content_type, body, keep_alive):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode("utf-8")
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def serve(self, host, port):
+        # One pool for the server's lifetime, shared by both render paths
+        self.executor = subp.render_executor(self.renderer.workers, init_worker,
+                                             (self.offline, asset_encoding.profile_name()))
+        self.renderer.executor = self.executor
+        self.renderer.start()
+        server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_HEADER_BYTES)
+        print(f"Serving the card collection on http://{host}:{port}/ "
+              f"({self.renderer.workers} render workers)")
+        started = time.monotonic()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.renderer.stop()
+            if self.executor:
+                self.executor.shutdown(cancel_futures=True)
+            elapsed = time.monotonic() - started
+            metrics = self.metrics()
+            print(f"\n{self.requests} requests in {elapsed:.0f}s, {metrics['renders']} cards rendered, "
+                  f"{metrics['coalesced']} duplicate renders coalesced")
+            if self.on_demand:
+                stats = metrics["card_cache"]
+                print(f"Card cache: {stats['hits']} hits, {stats['misses']} misses "
+                      f"({stats['hit_rate']:.0%}), {stats['evictions']} evictions, "
+                      f"{stats['bytes'] / 1024 / 1024:.1f} MiB in use")
+
+
+def init_worker(offline, profile):
+    """Render worker setup: same art source and encoder profile as the server"""
+    subp.use_asset_pack(offline)
+    asset_encoding.set_profile(profile)
+
+
+def read_file(filename):
+    with open(filename, "rb") as f:
+        return f.read()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the card collection over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="render worker processes (default: one per CPU)")
+    parser.add_argument("--unlocks", default="unlocks.txt", help="unlocks file to serve")
+    parser.add_argument("--on-demand", action="store_true",
+                        help="render cards in memory and serve them from an LRU cache instead of card files")
+    parser.add_argument("--cache-mb", type=float, default=None,
+                        help="memory budget of the card cache in MiB (default 64, or MCOC_CARD_CACHE_MB)")
+    parser.add_argument("--profile", choices=sorted(asset_encoding.ENCODER_PROFILES),
+                        default=asset_encoding.profile_name(),
+                        help="encoder profile for rendered cards")
+    parser.add_argument("--offline", metavar="PACK",
+                        help="take source art from an asset pack and never use the network")
+    args = parser.parse_args(argv)
+
+    if args.offline:
+        try:
+            subp.use_asset_pack(args.offline)
+        except ValueError as e:
+            parser.error(str(e))
+    asset_encoding.set_profile(args.profile)
+    store = UnlockStore(args.unlocks)
+    store.create()
+    cache_bytes = int(args.cache_mb * 1024 * 1024) if args.cache_mb else None
+    server = CardServer(store, args.workers, args.on_demand, cache_bytes, args.offline)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
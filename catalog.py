@@ -0,0 +1,107 @@
+import os
+from collections import namedtuple
+
+import quote_store
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Another series can be run by pointing MCOC_CATALOG at its own catalog file
+CATALOG_FILE = os.environ.get("MCOC_CATALOG", os.path.join(BASE_DIR, "champions.tsv"))
+
+# Card numbers are zero-padded to at least this many digits (001, 002, ...)
+MIN_NUMBER_WIDTH = 3
+QUOTES_FILE = quote_store.QUOTES_FILE
+
+Champion = namedtuple("Champion", "number name file_name wiki_slug redacted_name quote")
+
+
+def redact_name(name):
+    """Replace A-Z letters with _ (underscores) while preserving spaces and punctuation"""
+    redacted = ""
+    for char in name:
+        if char.isalpha():  # Replace any letter (A-Z, a-z) with redaction block
+            redacted += "_ "  # Add space after each underscore
+        else:
+            redacted += char  # Keep spaces, parentheses, hyphens, etc.
+    return redacted.rstrip()  # Remove trailing space
+
+
+def file_safe_name(name):
+    """Name as used in image and card file names"""
+    return name.replace(' ', '_')
+
+
+def load_quotes(filename=QUOTES_FILE):
+    """Read the champion quotes list, returns card number -> quote"""
+    if filename == QUOTES_FILE:
+        return quote_store.get_store().quotes()
+    return quote_store.QuoteStore(filename, cache_filename=None).quotes()
+
+
+def load_catalog(filename=CATALOG_FILE, quotes_filename=QUOTES_FILE):
+    """Parse the catalog data file into a list of Champion entries"""
+    quotes = load_quotes(quotes_filename)
+    entries = []
+    with open(filename, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line or line.startswith("#"):
+                continue
+            fields = line.split("\t")
+            number = int(fields[0])
+            name = fields[1]
+            wiki_slug = fields[2] if len(fields) > 2 and fields[2] else file_safe_name(name)
+            entries.append(Champion(number, name, file_safe_name(name), wiki_slug,
+                                    redact_name(name), quotes.get(number, "")))
+    return entries
+
+
+class Catalog:
+    """Champion entries with O(1) lookups by number, name, file name and wiki slug
+
+    The catalog also decides how card numbers are written: `width` digits,
+    enough for the highest number in the set, and "NNN/total" labels.
+    """
+
+    def __init__(self, entries):
+        self.entries = sorted(entries, key=lambda entry: entry.number)
+        self.by_number = {entry.number: entry for entry in self.entries}
+        self.by_name = {entry.name: entry for entry in self.entries}
+        self.by_file_name = {entry.file_name: entry for entry in self.entries}
+        self.by_wiki_slug = {entry.wiki_slug: entry for entry in self.entries}
+        self.max_number = self.entries[-1].number if self.entries else 0
+        self.width = max(MIN_NUMBER_WIDTH, len(str(self.max_number)))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __contains__(self, number):
+        return number in self.by_number
+
+    def get(self, number):
+        return self.by_number.get(number)
+
+    def find_by_name(self, name):
+        return self.by_name.get(name)
+
+    def find_by_file_name(self, file_name):
+        return self.by_file_name.get(file_name)
+
+    def find_by_wiki_slug(self, wiki_slug):
+        return self.by_wiki_slug.get(wiki_slug)
+
+    def numbers(self):
+        return [entry.number for entry in self.entries]
+
+    def format_number(self, number):
+        """Zero-padded card number, e.g. 007"""
+        return f"{number:0{self.width}d}"
+
+    def label(self, number):
+        """Card number out of the set size, e.g. 007/100"""
+        return f"{self.format_number(number)}/{len(self.entries)}"
+
+
+champions = Catalog(load_catalog())
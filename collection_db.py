@@ -0,0 +1,258 @@
+"""Collections for many players in one SQLite database
+
+Each player's unlocks are stored as a bitset, one bit per card (13 bytes
+for 100 cards), in a WAL-mode SQLite file that many processes can share.
+
+    python collection_db.py import alice unlocks.txt
+    python collection_db.py export alice alice_unlocks.txt
+    python collection_db.py show alice
+    python collection_db.py stats
+"""
+import os
+import sqlite3
+import sys
+from collections import Counter
+
+import catalog
+from unlock_store import UnlockStore
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DEFAULT_DB_FILE = "collections.db"
+
+# Number of bits set in each byte value
+POPCOUNT = bytes(bin(value).count("1") for value in range(256))
+
+
+def bitset_size(total):
+    return (total + 7) // 8
+
+
+def card_bit(number):
+    """(byte offset, mask) of a card's bit; card 1 is bit 0 of byte 0"""
+    return (number - 1) >> 3, 1 << ((number - 1) & 7)
+
+
+def popcount(bits):
+    return sum(POPCOUNT[byte] for byte in bits)
+
+
+def bits_to_numbers(bits):
+    numbers = []
+    for offset, byte in enumerate(bits):
+        while byte:
+            low = byte & -byte
+            numbers.append(offset * 8 + low.bit_length())
+            byte ^= low
+    return numbers
+
+
+class CollectionDB:
+    """Per-user unlock bitsets in a shared SQLite (WAL) database
+
+    A row holds the user name, the bitset and its popcount, so reading or
+    changing one card touches a single row by primary key and completion
+    statistics never have to unpack bits. Writes use BEGIN IMMEDIATE so
+    concurrent writers queue on SQLite's lock instead of losing updates.
+    """
+
+    def __init__(self, filename=DEFAULT_DB_FILE, total=None):
+        self.filename = filename
+        self.total = total or max(catalog.champions.numbers(), default=100)
+        self.size = bitset_size(self.total)
+        self.db = sqlite3.connect(filename, timeout=30, isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS collections ("
+            " user TEXT PRIMARY KEY,"
+            " bits BLOB NOT NULL,"
+            " unlocked INTEGER NOT NULL DEFAULT 0"
+            ") WITHOUT ROWID"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS collections_unlocked ON collections (unlocked)")
+
+    def close(self):
+        self.db.close()
+
+    def _check(self, number):
+        if not 1 <= number <= self.total:
+            raise ValueError(f"card number {number} is out of range 1-{self.total}")
+
+    def get_bits(self, user):
+        row = self.db.execute("SELECT bits FROM collections WHERE user = ?", (user,)).fetchone()
+        return bytes(row[0]).ljust(self.size, b"\0") if row else bytes(self.size)
+
+    def _put_bits(self, user, bits):
+        self.db.execute(
+            "INSERT INTO collections (user, bits, unlocked) VALUES (?, ?, ?)"
+            " ON CONFLICT(user) DO UPDATE SET bits = excluded.bits, unlocked = excluded.unlocked",
+            (user, bytes(bits), popcount(bits)),
+        )
+
+    def users(self):
+        return [row[0] for row in self.db.execute("SELECT user FROM collections ORDER BY user")]
+
+    def is_unlocked(self, user, number):
+        self._check(number)
+        offset, mask = card_bit(number)
+        return bool(self.get_bits(user)[offset] & mask)
+
+    def unlocked_numbers(self, user):
+        return bits_to_numbers(self.get_bits(user))
+
+    def unlocked_count(self, user):
+        row = self.db.execute("SELECT unlocked FROM collections WHERE user = ?", (user,)).fetchone()
+        return row[0] if row else 0
+
+    def set_status(self, user, number, unlocked=True):
+        return self.set_many(user, [number], unlocked) == 1
+
+    def set_many(self, user, numbers, unlocked=True):
+        """Lock or unlock several cards in one transaction
+
+        Returns the number of cards whose state changed.
+        """
+        numbers = list(numbers)
+        for number in numbers:
+            self._check(number)
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            bits = bytearray(self.get_bits(user))
+            before = popcount(bits)
+            for number in numbers:
+                offset, mask = card_bit(number)
+                if unlocked:
+                    bits[offset] |= mask
+                else:
+                    bits[offset] &= ~mask
+            changed = abs(popcount(bits) - before)
+            self._put_bits(user, bits)
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        return changed
+
+    def delete_user(self, user):
+        self.db.execute("DELETE FROM collections WHERE user = ?", (user,))
+
+    # -- statistics -------------------------------------------------------------
+
+    def completion_counts(self):
+        """unlocked card count -> number of users with that many cards"""
+        return dict(self.db.execute("SELECT unlocked, COUNT(*) FROM collections GROUP BY unlocked"))
+
+    def completed_users(self):
+        """Number of users who have every card"""
+        return self.db.execute("SELECT COUNT(*) FROM collections WHERE unlocked >= ?", (self.total,)).fetchone()[0]
+
+    def card_counts(self):
+        """card number -> number of users who have unlocked it
+
+        The bitsets are tallied one byte column at a time (how many users
+        have each byte value at each offset), so the per-card counts come
+        from at most 256 distinct values per byte instead of unpacking
+        every user's bits. With numpy the whole table is unpacked in one go.
+        """
+        if np is not None:
+            blobs = b"".join(bytes(bits[:self.size]).ljust(self.size, b"\0")
+                             for (bits,) in self.db.execute("SELECT bits FROM collections"))
+            matrix = np.frombuffer(blobs, dtype=np.uint8).reshape(-1, self.size)
+            totals = np.unpackbits(matrix, axis=1, bitorder="little").sum(axis=0, dtype=np.int64)
+            return {number: int(totals[number - 1]) for number in range(1, self.total + 1)}
+
+        columns = [Counter() for _ in range(self.size)]
+        for (bits,) in self.db.execute("SELECT bits FROM collections"):
+            for offset, byte in enumerate(bits[:self.size]):
+                columns[offset][byte] += 1
+        counts = {number: 0 for number in range(1, self.total + 1)}
+        for offset, column in enumerate(columns):
+            for value, users in column.items():
+                for number in bits_to_numbers(bytes([value])):
+                    number += offset * 8
+                    if number <= self.total:
+                        counts[number] += users
+        return counts
+
+    def rarest_cards(self, limit=10):
+        """The `limit` least unlocked cards as (card number, users) pairs"""
+        counts = self.card_counts()
+        return sorted(counts.items(), key=lambda item: (item[1], item[0]))[:limit]
+
+    # -- unlocks.txt interchange ------------------------------------------------
+
+    def import_unlocks(self, user, filename="unlocks.txt"):
+        """Replace a user's collection with the cards unlocked in an unlocks.txt file
+
+        Raises FileNotFoundError if the file does not exist, rather than
+        reading it as an empty collection.
+        """
+        store = UnlockStore(filename)
+        if not store.exists():
+            raise FileNotFoundError(f"no unlocks file at {filename}")
+        numbers = [n for n in store.unlocked_numbers() if 1 <= n <= self.total]
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            bits = bytearray(self.size)
+            for number in numbers:
+                offset, mask = card_bit(number)
+                bits[offset] |= mask
+            self._put_bits(user, bits)
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        return len(numbers)
+
+    def export_unlocks(self, user, filename="unlocks.txt"):
+        """Write a user's collection in the unlocks.txt format"""
+        store = UnlockStore(filename, range(1, self.total + 1))
+        store.create()
+        unlocked = set(self.unlocked_numbers(user))
+        store.set_many({n: "YES" if n in unlocked else "NO" for n in range(1, self.total + 1)})
+        store.compact()
+        return len(unlocked)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    commands = {"import": 2, "export": 2, "show": 2, "stats": 1}
+    if not argv or argv[0] not in commands or len(argv) < commands[argv[0]]:
+        print("Usage: python collection_db.py import USER [unlocks.txt] | export USER [file] | show USER | stats")
+        return 2
+    db = CollectionDB(os.environ.get("MCOC_COLLECTION_DB", DEFAULT_DB_FILE))
+    command = argv[0]
+    if command == "import":
+        filename = argv[2] if len(argv) > 2 else "unlocks.txt"
+        try:
+            count = db.import_unlocks(argv[1], filename)
+        except FileNotFoundError as e:
+            print(f"Error: {e}")
+            db.close()
+            return 1
+        print(f"Imported {count} unlocked cards for {argv[1]}")
+    elif command == "export":
+        filename = argv[2] if len(argv) > 2 else "unlocks.txt"
+        print(f"Exported {db.export_unlocks(argv[1], filename)} unlocked cards for {argv[1]} to {filename}")
+    elif command == "show":
+        numbers = db.unlocked_numbers(argv[1])
+        print(f"{argv[1]}: {len(numbers)}/{db.total} cards unlocked")
+        for number in numbers:
+            champion = catalog.champions.get(number)
+            print(f"  {catalog.champions.format_number(number)} {champion.name if champion else ''}")
+    else:
+        users = sum(db.completion_counts().values())
+        print(f"{users} collections, {db.completed_users()} complete")
+        for number, count in db.rarest_cards():
+            champion = catalog.champions.get(number)
+            print(f"  {catalog.champions.format_number(number)} {champion.name if champion else '':30} {count} users")
+    db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
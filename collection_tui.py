@@ -0,0 +1,243 @@
+"""Full-screen collection dashboard
+
+Shows the card grid with locked/unlocked state, and the selected card's
+champion name and quote. Catalogs taller than the terminal scroll with
+the selection. Move with the arrow keys (or hjkl), press
+Enter or u to unlock the selected card, r to reload, q to quit.
+
+    python Marvel_Card_Unlock_Program.py --tui
+"""
+import threading
+
+try:
+    import curses
+except ImportError:  # Windows without the windows-curses package
+    curses = None
+
+import catalog
+
+COLUMNS = 10
+
+# Lines above (title, blank) and below (blank, footer) the grid
+HEADER_LINES = 2
+FOOTER_LINES = 5
+
+# How often the screen polls for keys and external changes to unlocks.txt
+POLL_MS = 250
+
+
+class Dashboard:
+    """Grid view of the collection, redrawn cell by cell
+
+    Every cell's last drawn state is remembered and only cells whose state
+    changed are redrawn. Each frame is staged with noutrefresh() and sent to
+    the terminal with a single doupdate(), which curses turns into the
+    minimal set of terminal updates, so the screen stays responsive over
+    slow connections.
+    """
+
+    def __init__(self, screen, store, generate=None):
+        self.screen = screen
+        self.store = store
+        self.generate = generate
+        self.numbers = catalog.champions.numbers()
+        self.rows = (len(self.numbers) + COLUMNS - 1) // COLUMNS
+        self.selected = 0
+        self.message = ""
+        self.busy = set()
+        self.lock = threading.Lock()
+        self.drawn = {}
+        self.drawn_footer = None
+        self.drawn_count = None
+        self.layout = None
+        self.top_row = 0
+
+    # -- drawing --------------------------------------------------------------
+
+    def cell_state(self, index, unlocks):
+        number = self.numbers[index]
+        with self.lock:
+            busy = number in self.busy
+        return (unlocks.get(self.store.key(number)) == "YES", index == self.selected, busy)
+
+    def compute_layout(self):
+        height, width = self.screen.getmaxyx()
+        cell_width = max(catalog.champions.width + 1, min(16, (width - 1) // COLUMNS))
+        visible_rows = max(1, min(self.rows, height - HEADER_LINES - FOOTER_LINES))
+        return height, width, cell_width, visible_rows
+
+    def scroll_to_selection(self, visible_rows):
+        """Move the viewport so the selected row is on screen, True if it moved"""
+        row = self.selected // COLUMNS
+        top_row = min(max(self.top_row, row - visible_rows + 1), row, self.rows - visible_rows)
+        if top_row == self.top_row:
+            return False
+        self.top_row = top_row
+        return True
+
+    def draw_cell(self, index, state, cell_width):
+        unlocked, selected, busy = state
+        number = self.numbers[index]
+        champion = catalog.champions.get(number)
+        label = catalog.champions.format_number(number)
+        if cell_width > len(label) + 2:
+            name = champion.name if unlocked else champion.redacted_name.replace(" ", "")
+            label = f"{label} {name}"
+        if busy:
+            label = f"{catalog.champions.format_number(number)} ..."
+        label = label[:cell_width - 1].ljust(cell_width - 1)
+
+        attr = curses.A_BOLD if unlocked else curses.A_DIM
+        if unlocked and curses.has_colors():
+            attr |= curses.color_pair(1)
+        if selected:
+            attr |= curses.A_REVERSE
+        y = HEADER_LINES + index // COLUMNS - self.top_row
+        x = (index % COLUMNS) * cell_width
+        try:
+            self.screen.addstr(y, x, label, attr)
+        except curses.error:
+            pass  # cell falls off a too-small terminal
+
+    def footer_lines(self, unlocks, width):
+        number = self.numbers[self.selected]
+        champion = catalog.champions.get(number)
+        unlocked = unlocks.get(self.store.key(number)) == "YES"
+        name = champion.name if unlocked else champion.redacted_name
+        quote = f'"{champion.quote}"' if unlocked and champion.quote else ""
+        return [
+            f"#{catalog.champions.label(number)} {name} - {'UNLOCKED' if unlocked else 'LOCKED'}"[:width - 1],
+            quote[:width - 1],
+            self.message[:width - 1],
+            "arrows/hjkl move  enter/u unlock  r reload  q quit"[:width - 1],
+        ]
+
+    def draw(self):
+        """Stage the visible cells and footer lines that changed, then flush once"""
+        layout = self.compute_layout()
+        height, width, cell_width, visible_rows = layout
+        scrolled = self.scroll_to_selection(visible_rows)
+        if layout != self.layout or scrolled:
+            # Resized or scrolled: everything has to be drawn again
+            self.layout = layout
+            self.drawn = {}
+            self.drawn_footer = None
+            self.drawn_count = None
+            self.screen.erase()
+
+        unlocks = self.store.statuses()
+        count = self.store.unlocked_count()
+        if count != self.drawn_count:
+            self.draw_header(count, width)
+            self.drawn_count = count
+        first = self.top_row * COLUMNS
+        for index in range(first, min(first + visible_rows * COLUMNS, len(self.numbers))):
+            state = self.cell_state(index, unlocks)
+            if self.drawn.get(index) != state:
+                self.draw_cell(index, state, cell_width)
+                self.drawn[index] = state
+
+        footer = self.footer_lines(unlocks, width)
+        if footer != self.drawn_footer:
+            top = HEADER_LINES + 1 + visible_rows
+            for offset, line in enumerate(footer):
+                if top + offset >= height:
+                    break
+                self.screen.move(top + offset, 0)
+                self.screen.clrtoeol()
+                try:
+                    self.screen.addstr(top + offset, 0, line)
+                except curses.error:
+                    pass
+            self.drawn_footer = footer
+
+        self.screen.noutrefresh()
+        curses.doupdate()
+
+    def draw_header(self, count, width):
+        title = f"MARVEL CONTEST OF CHAMPIONS CARD COLLECTION  {count}/{len(self.numbers)} unlocked"
+        self.screen.move(0, 0)
+        self.screen.clrtoeol()
+        try:
+            self.screen.addstr(0, 0, title[:width - 1], curses.A_BOLD)
+        except curses.error:
+            pass
+
+    # -- input ----------------------------------------------------------------
+
+    def move(self, rows, columns):
+        row, column = divmod(self.selected, COLUMNS)
+        row = (row + rows) % self.rows
+        column = (column + columns) % COLUMNS
+        self.selected = min(row * COLUMNS + column, len(self.numbers) - 1)
+
+    def unlock_selected(self):
+        number = self.numbers[self.selected]
+        card_num = catalog.champions.format_number(number)
+        name = catalog.champions.get(number).name
+        if self.store.is_unlocked(number):
+            self.message = f"Card {card_num} {name} is already in your collection"
+            return
+        if not self.store.set_status(number, "YES"):
+            self.message = f"Could not unlock card {card_num}"
+            return
+        self.message = f"Card {card_num} {name} has been added to your collection!"
+        if self.generate:
+            with self.lock:
+                self.busy.add(number)
+            threading.Thread(target=self._generate, args=(number,), daemon=True).start()
+
+    def _generate(self, number):
+        """Generate a card in the background so the grid stays responsive"""
+        try:
+            # curses owns the terminal; show the generator's messages in the status line
+            results = self.generate([number], log=self._log)
+            failed = [catalog.champions.format_number(n) for n, _, status, _ in results or () if status == "failed"]
+            if failed:
+                self.message = f"{len(failed)} {'card' if len(failed) == 1 else 'cards'} failed: {', '.join(failed)}"
+        except Exception as e:
+            self.message = f"Could not generate card {catalog.champions.format_number(number)}: {e}"
+        finally:
+            with self.lock:
+                self.busy.discard(number)
+
+    def _log(self, message):
+        self.message = message.strip()
+
+    def run(self):
+        curses.curs_set(0)
+        if curses.has_colors():
+            curses.start_color()
+            curses.use_default_colors()
+            curses.init_pair(1, curses.COLOR_GREEN, -1)
+        self.screen.timeout(POLL_MS)
+        self.screen.keypad(True)
+
+        while True:
+            self.draw()
+            key = self.screen.getch()
+            if key == -1:
+                continue  # timeout: redraw picks up external changes
+            if key in (ord("q"), ord("Q"), 27):
+                break
+            elif key in (curses.KEY_UP, ord("k")):
+                self.move(-1, 0)
+            elif key in (curses.KEY_DOWN, ord("j")):
+                self.move(1, 0)
+            elif key in (curses.KEY_LEFT, ord("h")):
+                self.move(0, -1)
+            elif key in (curses.KEY_RIGHT, ord("l")):
+                self.move(0, 1)
+            elif key in (curses.KEY_ENTER, 10, 13, ord("u")):
+                self.unlock_selected()
+            elif key == ord("r"):
+                self.layout = None
+            elif key == curses.KEY_RESIZE:
+                self.layout = None
+
+
+def run_dashboard(store, generate=None):
+    """Run the dashboard until the user quits"""
+    if curses is None:
+        raise RuntimeError("the dashboard needs the curses module (pip install windows-curses)")
+    curses.wrapper(lambda screen: Dashboard(screen, store, generate).run())
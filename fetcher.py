@@ -0,0 +1,150 @@
+import atexit
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from http_cache import HttpCache
+
+# Keep-alive connections kept per host in the shared session
+POOL_SIZE = 16
+
+# Politeness limits applied to every host (requests per second and burst size)
+DEFAULT_RATE = float(os.environ.get("MCOC_FETCH_RATE", "8"))
+DEFAULT_BURST = int(os.environ.get("MCOC_FETCH_BURST", "8"))
+
+DEFAULT_TIMEOUT = 10
+
+
+class TokenBucket:
+    """Thread-safe token bucket used to rate limit requests to one host"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+_session = None
+_session_lock = threading.Lock()
+_limiters = {}
+_limiters_lock = threading.Lock()
+_rate = DEFAULT_RATE
+_burst = DEFAULT_BURST
+_cache = None
+_cache_enabled = True
+
+
+def get_session():
+    """Return the shared, connection-pooled session"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+
+def set_rate_limit(rate, burst=None):
+    """Change the per-host request rate (0 disables rate limiting)"""
+    global _rate, _burst
+    with _limiters_lock:
+        _rate = rate
+        if burst is not None:
+            _burst = burst
+        _limiters.clear()
+
+
+def get_cache():
+    """Return the shared on-disk response cache (None if caching is disabled)"""
+    global _cache
+    with _session_lock:
+        if _cache is None and _cache_enabled:
+            _cache = HttpCache()
+            atexit.register(_cache.flush)
+        return _cache
+
+
+def flush_cache():
+    """Write the response cache's index changes to disk"""
+    cache = _cache
+    if cache is not None:
+        cache.flush()
+
+
+def set_cache(cache):
+    """Replace the shared response cache, or disable caching with None"""
+    global _cache, _cache_enabled
+    with _session_lock:
+        _cache = cache
+        _cache_enabled = cache is not None
+
+
+def get_limiter(host):
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = TokenBucket(_rate, _burst)
+            _limiters[host] = limiter
+        return limiter
+
+
+def request(method, url, **kwargs):
+    """Send a rate-limited request through the shared session"""
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    get_limiter(urlsplit(url).netloc).acquire()
+    return get_session().request(method, url, **kwargs)
+
+
+def get(url, **kwargs):
+    """GET through the response cache when it is enabled"""
+    cache = get_cache()
+    if cache is None:
+        return request("GET", url, **kwargs)
+    headers = kwargs.pop("headers", None)
+    return cache.get(url, lambda h: request("GET", url, headers=h, **kwargs), headers,
+                     stream=kwargs.get("stream", False))
+
+
+def remember(url, response, path):
+    """Add a streamed download that was saved to path to the response cache"""
+    cache = get_cache()
+    if cache is not None and response.status_code == 200 and not getattr(response, "from_cache", False):
+        cache.store_file(url, response, path)
+
+
+def head(url, **kwargs):
+    return request("HEAD", url, **kwargs)
+
+
+def fetch_all(func, items, workers=8):
+    """Run func over items on a thread pool, returning futures in item order"""
+    executor = ThreadPoolExecutor(max_workers=max(1, workers))
+    try:
+        return [executor.submit(func, *item) for item in items]
+    finally:
+        executor.shutdown(wait=False)
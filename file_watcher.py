@@ -0,0 +1,208 @@
+"""Wait for changes to files and directory trees
+
+Uses Linux inotify through ctypes when it is available and falls back to
+polling stat() snapshots everywhere else (or when forced, e.g. for network
+file systems that never deliver inotify events).
+
+    watcher = FileWatcher(["unlocks.txt", "images"])
+    changed = watcher.wait()   # {"unlocks.txt"} or {"images/001_Ægon.png", ...}
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+
+# inotify event bits (<sys/inotify.h>)
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+
+_EVENT = struct.Struct("iIII")
+
+# Seconds between snapshots when polling
+POLL_INTERVAL = 1.0
+
+
+def _load_inotify():
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError, TypeError):
+        return None  # not Linux, or no C library to load
+
+
+class FileWatcher:
+    """Report which of the watched paths changed
+
+    A watched file is reported by its own path (it is watched through its
+    directory, so replacing it with os.replace is seen too). A watched
+    directory is watched with all its subdirectories and changes are
+    reported as paths of the files inside it; when events were lost
+    (inotify queue overflow) the directory itself is reported.
+    """
+
+    def __init__(self, paths, poll_interval=POLL_INTERVAL, force_polling=False):
+        self.files = {}        # parent directory -> names of watched files in it
+        self.trees = []
+        for path in paths:
+            path = os.path.normpath(path)
+            if os.path.isdir(path):
+                self.trees.append(path)
+            else:
+                self.files.setdefault(os.path.dirname(path) or ".", set()).add(os.path.basename(path))
+        self.poll_interval = poll_interval
+        self.fd = None
+        self.watches = {}      # inotify watch descriptor -> directory
+        self.snapshot = None
+        libc = None if force_polling else _load_inotify()
+        if libc is not None:
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd >= 0:
+                self.libc, self.fd = libc, fd
+                for directory in self.files:
+                    self._add_watch(directory)
+                for tree in self.trees:
+                    self._add_tree(tree)
+        if self.fd is None:
+            self.snapshot = self._take_snapshot()
+
+    @property
+    def backend(self):
+        return "polling" if self.fd is None else "inotify"
+
+    def wait(self, timeout=None):
+        """Block until something changes (or timeout seconds pass), returns the changed paths"""
+        if self.fd is None:
+            return self._poll(timeout)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            ready, _, _ = select.select([self.fd], [], [], remaining)
+            if not ready:
+                return set()
+            changed = self._read_events()
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # -- inotify ----------------------------------------------------------------
+
+    def _add_watch(self, directory):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd >= 0:
+            self.watches[wd] = directory
+
+    def _add_tree(self, tree):
+        for root, _, _ in os.walk(tree):
+            self._add_watch(root)
+
+    def _read_events(self):
+        changed = set()
+        try:
+            data = os.read(self.fd, 1 << 16)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b"\0")
+            offset += _EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                changed.update(self.trees)
+                changed.update(os.path.join(d, n) for d, names in self.files.items() for n in names)
+                continue
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+            directory = self.watches.get(wd)
+            if directory is None or not name:
+                continue
+            name = os.fsdecode(name)
+            path = os.path.join(directory, name)
+            if name in self.files.get(directory, ()):
+                changed.add(os.path.normpath(path))
+            tree = self._tree_of(directory)
+            if tree is None:
+                continue
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self._add_tree(path)  # new shard directory: watch it and report what is already in it
+                    changed.update(_files_under(path))
+            else:
+                changed.add(os.path.normpath(path))
+        return changed
+
+    def _tree_of(self, directory):
+        for tree in self.trees:
+            if directory == tree or directory.startswith(tree + os.sep):
+                return tree
+        return None
+
+    # -- polling ----------------------------------------------------------------
+
+    def _take_snapshot(self):
+        snapshot = {}
+        for directory, names in self.files.items():
+            for name in names:
+                path = os.path.normpath(os.path.join(directory, name))
+                snapshot[path] = _stat_key(path)
+        for tree in self.trees:
+            for path in _files_under(tree):
+                snapshot[path] = _stat_key(path)
+        return snapshot
+
+    def _poll(self, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            snapshot = self._take_snapshot()
+            changed = {path for path in snapshot.keys() | self.snapshot.keys()
+                       if snapshot.get(path) != self.snapshot.get(path)}
+            self.snapshot = snapshot
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            delay = self.poll_interval
+            if deadline is not None:
+                delay = min(delay, max(0.0, deadline - time.monotonic()))
+            time.sleep(delay)
+
+
+def _stat_key(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _files_under(tree):
+    paths = []
+    for root, _, names in os.walk(tree):
+        paths.extend(os.path.normpath(os.path.join(root, name)) for name in names)
+    return paths
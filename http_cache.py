@@ -0,0 +1,294 @@
+import email.utils
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+DEFAULT_CACHE_DIR = ".http_cache"
+DEFAULT_MAX_BYTES = int(os.environ.get("MCOC_HTTP_CACHE_MB", "512")) * 1024 * 1024
+
+# Response headers kept with a cached body
+STORED_HEADERS = ("content-type", "etag", "last-modified", "cache-control", "expires")
+
+
+class HttpCache:
+    """Persistent, size-bounded HTTP response cache
+
+    Bodies are stored once per content hash under blobs/, and index.json maps
+    each URL to its blob plus the validators needed for conditional requests.
+    Fresh entries are served without touching the network, stale ones are
+    revalidated with If-None-Match / If-Modified-Since, and the least
+    recently used entries are evicted once the cache outgrows max_bytes.
+
+    Index changes are kept in memory and written by flush(), which merges
+    them with the index on disk under a file lock, so processes sharing the
+    cache keep each other's entries. Call it once per run.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.blob_directory = os.path.join(directory, "blobs")
+        self.index_filename = os.path.join(directory, "index.json")
+        self.lock_filename = os.path.join(directory, "index.lock")
+        self.max_bytes = max_bytes
+        self.lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._index = None
+        self._dirty = False
+        self._removed = {}      # url -> time it was evicted from this process's index
+        self._cleared = 0.0
+
+    def stats(self):
+        """Return hit/miss/revalidation counters and current size"""
+        with self.lock:
+            index = self._load_index()
+            blobs = {entry["blob"]: entry["size"] for entry in index.values()}
+            lookups = self.hits + self.misses + self.revalidations
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidations": self.revalidations,
+                "hit_rate": (self.hits + self.revalidations) / lookups if lookups else 0.0,
+                "entries": len(index),
+                "bytes": sum(blobs.values()),
+            }
+
+    def get(self, url, send, headers=None, stream=False):
+        """Fetch url through the cache
+
+        `send(headers)` performs the real GET and returns a requests.Response.
+        Streamed 200 responses are not stored automatically; the caller
+        stores the body with store_file() once it has been written out.
+        """
+        headers = dict(headers or {})
+        with self.lock:
+            entry = self._load_index().get(url)
+            body = self._read_blob(entry) if entry else None
+
+        if entry and body is not None:
+            if entry.get("expires") and entry["expires"] > time.time():
+                self._touch(url, hits=1)
+                return self._response(url, entry, body)
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = send(headers)
+
+        if response.status_code == 304 and entry and body is not None:
+            with self.lock:
+                entry["expires"] = _expiry(response.headers)
+                self._touch(url, revalidations=1)
+            return self._response(url, entry, body)
+
+        with self.lock:
+            self.misses += 1
+        if response.status_code == 200 and not stream:
+            self.store(url, response)
+        return response
+
+    def store(self, url, response):
+        """Store a 200 response body for url"""
+        body = response.content
+        digest = hashlib.sha256(body).hexdigest()
+        with self.lock:
+            blob_path = self._blob_path(digest)
+            if not os.path.exists(blob_path):
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                tmp_path = f"{blob_path}.{os.getpid()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(body)
+                os.replace(tmp_path, blob_path)
+
+            self._index_entry(url, response.headers, digest, len(body))
+
+    def store_file(self, url, response, path):
+        """Store a 200 response whose body was already saved to path"""
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                digest.update(chunk)
+        digest = digest.hexdigest()
+        with self.lock:
+            blob_path = self._blob_path(digest)
+            if not os.path.exists(blob_path):
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                tmp_path = f"{blob_path}.{os.getpid()}.tmp"
+                shutil.copyfile(path, tmp_path)
+                os.replace(tmp_path, blob_path)
+            self._index_entry(url, response.headers, digest, os.path.getsize(blob_path))
+
+    def clear(self):
+        with self.lock:
+            self._index = {}
+            self._removed.clear()
+            self._cleared = time.time()
+            self._dirty = True
+            self.flush()
+
+    def flush(self):
+        """Write index changes to disk, merged with what other processes wrote"""
+        with self.lock:
+            if not self._dirty:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            with self._locked():
+                index = self._read_index()
+                for url, entry in list(index.items()):
+                    if entry["used"] <= max(self._cleared, self._removed.get(url, 0.0)):
+                        del index[url]
+                for url, entry in self._index.items():
+                    if url not in index or index[url]["used"] <= entry["used"]:
+                        index[url] = entry
+                self._index = index
+                if self._cleared:
+                    self._remove_unused_blobs()
+                self._evict()
+                self._save_index()
+            self._removed.clear()
+            self._cleared = 0.0
+            self._dirty = False
+
+    def _index_entry(self, url, headers, digest, size):
+        index = self._load_index()
+        index[url] = {
+            "blob": digest,
+            "size": size,
+            "headers": {k: v for k, v in headers.items() if k.lower() in STORED_HEADERS},
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "expires": _expiry(headers),
+            "used": time.time(),
+        }
+        self._removed.pop(url, None)
+        self._dirty = True
+
+    def _touch(self, url, hits=0, revalidations=0):
+        self.hits += hits
+        self.revalidations += revalidations
+        entry = self._load_index().get(url)
+        if entry:
+            entry["used"] = time.time()
+            self._dirty = True
+
+    def _evict(self):
+        index = self._index
+        sizes = {}
+        for entry in index.values():
+            sizes[entry["blob"]] = entry["size"]
+        total = sum(sizes.values())
+        if total <= self.max_bytes:
+            return
+
+        for url, entry in sorted(index.items(), key=lambda item: item[1]["used"]):
+            if total <= self.max_bytes:
+                break
+            del index[url]
+            self._removed[url] = time.time()
+            digest = entry["blob"]
+            if not any(other["blob"] == digest for other in index.values()):
+                total -= entry["size"]
+                try:
+                    os.remove(self._blob_path(digest))
+                except FileNotFoundError:
+                    pass
+
+    def _response(self, url, entry, body):
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response._content = body
+        response._content_consumed = True
+        response.from_cache = True
+        return response
+
+    def _blob_path(self, digest):
+        return os.path.join(self.blob_directory, digest[:2], digest)
+
+    def _read_blob(self, entry):
+        try:
+            with open(self._blob_path(entry["blob"]), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _remove_unused_blobs(self):
+        used = {entry["blob"] for entry in self._index.values()}
+        for root, _, files in os.walk(self.blob_directory):
+            for name in files:
+                if name not in used and not name.endswith(".tmp"):
+                    try:
+                        os.remove(os.path.join(root, name))
+                    except FileNotFoundError:
+                        pass
+
+    def _load_index(self):
+        if self._index is None:
+            self._index = self._read_index()
+        return self._index
+
+    def _read_index(self):
+        try:
+            with open(self.index_filename, "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save_index(self):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_filename = f"{self.index_filename}.{os.getpid()}.tmp"
+        with open(tmp_filename, "w") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_filename, self.index_filename)
+
+    @contextmanager
+    def _locked(self):
+        with open(self.lock_filename, "a+") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _expiry(headers):
+    """Work out when a response stops being fresh (None = always revalidate)"""
+    cache_control = headers.get("Cache-Control", "")
+    if "no-cache" in cache_control or "no-store" in cache_control:
+        return None
+    match = re.search(r"max-age=(\d+)", cache_control)
+    if match:
+        return time.time() + int(match.group(1))
+    expires = headers.get("Expires")
+    if expires:
+        try:
+            return email.utils.parsedate_to_datetime(expires).timestamp()
+        except (TypeError, ValueError):
+            return None
+    return None
@@ -0,0 +1,168 @@
+"""Indexed champion quotes compiled from quotes.py
+
+quotes.py is a plain text list of `Name - #NNN - "quote"` lines (a leading
+✔ marks a confirmed quote, and many quotes are still empty). QuoteStore
+parses it once into a card number -> entry map plus an inverted index of
+quote words, and caches the compiled form on disk until quotes.py changes.
+
+    python quote_store.py search clobberin time
+    python quote_store.py show 97
+"""
+import json
+import os
+import re
+import sys
+from collections import namedtuple
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+QUOTES_FILE = os.path.join(BASE_DIR, "quotes.py")
+CACHE_FILE = os.path.join(BASE_DIR, ".quotes_cache.json")
+
+# Bump when the compiled layout changes so old caches are rebuilt
+CACHE_VERSION = 1
+
+Quote = namedtuple("Quote", "number name text verified")
+
+LINE_PATTERN = re.compile(r'^\s*(✔\s*)?(.*?)\s+-\s+#(\d+)\s+-\s*(?:"(.*)")?\s*$')
+WORD_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+def tokenize(text):
+    """Lower-case words of a quote or query, ignoring punctuation"""
+    return [word.strip("'") for word in WORD_PATTERN.findall(text.lower()) if word.strip("'")]
+
+
+def parse_quotes(filename=QUOTES_FILE):
+    """Parse the quotes text file into a list of Quote entries"""
+    entries = []
+    with open(filename, "r", encoding="utf-8") as f:
+        for line in f:
+            match = LINE_PATTERN.match(line)
+            if match:
+                verified, name, number, text = match.groups()
+                entries.append(Quote(int(number), name, text or "", bool(verified)))
+    return entries
+
+
+class QuoteStore:
+    """O(1) quote lookup by card number and full-text search over quote words
+
+    The inverted index maps each word to the sorted card numbers whose quote
+    contains it; a search intersects the lists for the query's words,
+    smallest first. The compiled entries and index are written to a JSON
+    cache keyed by the source file's mtime and size, so later runs skip
+    parsing entirely. Pass cache_filename=None to skip the cache.
+    """
+
+    def __init__(self, filename=QUOTES_FILE, cache_filename=CACHE_FILE):
+        self.filename = filename
+        self.cache_filename = cache_filename
+        self.by_number = {}
+        self.index = {}
+        self.load()
+
+    def load(self):
+        """Load from the disk cache, recompiling it if quotes.py changed"""
+        try:
+            st = os.stat(self.filename)
+        except FileNotFoundError:
+            self.by_number, self.index = {}, {}
+            return
+        key = [CACHE_VERSION, st.st_mtime_ns, st.st_size]
+        if self.cache_filename and self._load_cache(key):
+            return
+        self.compile(parse_quotes(self.filename))
+        if self.cache_filename:
+            self._save_cache(key)
+
+    def compile(self, entries):
+        self.by_number = {entry.number: entry for entry in entries}
+        index = {}
+        for entry in entries:
+            for word in set(tokenize(entry.text)):
+                index.setdefault(word, []).append(entry.number)
+        self.index = {word: sorted(numbers) for word, numbers in index.items()}
+
+    def get(self, number):
+        return self.by_number.get(number)
+
+    def quote(self, number):
+        """Quote text for a card ("" if it has none)"""
+        entry = self.by_number.get(number)
+        return entry.text if entry else ""
+
+    def quotes(self):
+        """card number -> quote text for every card with a quote"""
+        return {number: entry.text for number, entry in self.by_number.items() if entry.text}
+
+    def search(self, query):
+        """Entries whose quote contains every word of the query"""
+        words = set(tokenize(query))
+        if not words:
+            return []
+        postings = sorted((self.index.get(word, []) for word in words), key=len)
+        matches = set(postings[0])
+        for numbers in postings[1:]:
+            matches.intersection_update(numbers)
+            if not matches:
+                break
+        return [self.by_number[number] for number in sorted(matches)]
+
+    def _load_cache(self, key):
+        try:
+            with open(self.cache_filename, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return False
+        if data.get("key") != key:
+            return False
+        self.by_number = {entry[0]: Quote(*entry) for entry in data["entries"]}
+        self.index = data["index"]
+        return True
+
+    def _save_cache(self, key):
+        data = {"key": key, "entries": [list(entry) for entry in self.by_number.values()], "index": self.index}
+        tmp_filename = f"{self.cache_filename}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_filename, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_filename, self.cache_filename)
+        except OSError:
+            pass  # read-only checkout: just recompile next time
+
+
+_store = None
+
+
+def get_store():
+    """Process-wide quote store, loaded on first use"""
+    global _store
+    if _store is None:
+        _store = QuoteStore()
+    return _store
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) < 2 or argv[0] not in ("search", "show"):
+        print("Usage: python quote_store.py search WORDS... | show NUMBER")
+        return 2
+    import catalog  # catalog loads its quotes through this module
+    number = catalog.champions.format_number
+    store = get_store()
+    if argv[0] == "show":
+        entry = store.get(int(argv[1]))
+        if not entry:
+            print(f"No card #{number(int(argv[1]))}")
+            return 1
+        print(f'#{number(entry.number)} {entry.name} - "{entry.text}"' if entry.text else f"#{number(entry.number)} {entry.name} - (no quote)")
+        return 0
+    results = store.search(" ".join(argv[1:]))
+    for entry in results:
+        print(f'#{number(entry.number)} {entry.name} - "{entry.text}"')
+    print(f"{len(results)} matching quotes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
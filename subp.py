@@ -1,14 +1,35 @@
+import functools
+import math
 import os
 import requests
-from PIL import Image, ImageDraw, ImageFont, ImageFilter
+from PIL import Image, ImageDraw, ImageFont, ImageFilter, ImageFile
 import re
+import threading
 from urllib.parse import quote, urljoin
 import time
 import json
+import zipfile
 import random
 
-# Your champions list
-champions = ["#1 Ægon", "#2 Agent Venom", "#3 Ant Man", "#4 Beast", "#5 Black Panther (Civil War)", "#6 Black Widow", "#7 Blade", "#8 Captain America", "#9 Captain America (Infinity War)", "#10 Captain Marvel (Classic)", "#11 Carnage", "#12 Civil Warrior", "#13 Colossus", "#14 Corvus Glaive", "#15 Cyclops (Blue Team)", "#16 Daredevil (Classic)", "#17 Deadpool", "#18 Doctor Octopus", "#19 Doctor Strange", "#20 Dormammu", "#21 Drax", "#22 Falcon", "#23 Gamora", "#24 Ghost", "#25 Ghost Rider", "#26 Green Goblin", "#27 Groot", "#28 Guillotine", "#29 Gwenpool", "#30 Hawkeye", "#31 Heimdall", "#32 Hela", "#33 Howard The Duck", "#34 Hulk", "#35 Hulk (Ragnarok)", "#36 Hulkbuster", "#37 Iceman", "#38 Iron Fist", "#39 Iron Man (Infinity War)", "#40 Joe Fixit", "#41 Killmonger", "#42 Kingpin", "#43 Korg", "#44 Loki", "#45 Luke Cage", "#46 Magneto (Marvel Now!)", "#47 Masacre", "#48 M.O.D.O.K.", "#49 Morningstar", "#50 Nebula", "#51 Phoenix", "#52 Proxima Midnight", "#53 Punisher", "#54 Red Hulk", "#55 Red Skull", "#56 Rocket Raccoon", "#57 Rogue", "#58 Scarlet Witch", "#59 Spider-Gwen", "#60 Spider-Man (Classic)", "#61 Spider-Man (Stark Enhanced)", "#62 Star-Lord", "#63 Storm", "#64 Thor (Ragnarok)", "#65 Ultron", "#66 Venom", "#67 Venompool", "#68 Vision (Age of Ultron)", "#69 War Machine", "#70 Wasp", "#71 Winter Soldier", "#72 Wolverine", "#73 Wolverine (X-23)", "#74 Yellowjacket", "#75 Yondu", "#76 Angela", "#77 Captain Marvel", "#78 Cull Obsidian", "#79 Darkhawk", "#80 Ebony Maw", "#81 Gambit", "#82 Human Torch", "#83 Invisible Woman", "#84 Juggernaut", "#85 Magik", "#86 Mister Sinister", "#87 Mysterio", "#88 Namor", "#89 Nick Fury", "#90 Ronin", "#91 Sabretooth", "#92 Sentinel", "#93 She-Hulk", "#94 Spider-Man (Stealth Suit)", "#95 Taskmaster", "#96 The Hood", "#97 Thing", "#98 Thor", "#99 Thor (Jane Foster)", "#100 Vulture"]
+import catalog
+import fetcher
+import asset_encoding
+import asset_pack
+import url_memo
+from asset_inventory import ASSET_DIRECTORIES, AssetInventory, asset_path, card_number_for_file
+from build_manifest import BuildManifest
+from unlock_store import UnlockStore
+
+# Asset pack used as the only art source in offline mode (see use_asset_pack)
+offline_pack = None
+
+# Source images of this process, scanned once (see source_inventory)
+_source_inventory = None
+
+# Base URLs for artwork lookups (override to point at a local stand-in server)
+WIKI_BASE_URL = os.environ.get("MCOC_WIKI_URL", "https://marvel-contestofchampions.fandom.com")
+STATIC_BASE_URL = os.environ.get("MCOC_STATIC_URL", "https://static.wikia.nocookie.net")
+VIGNETTE_BASE_URL = os.environ.get("MCOC_VIGNETTE_URL", "https://vignette.wikia.nocookie.net")
 
 def create_directories():
     """Create necessary directories"""
@@ -17,26 +38,23 @@ def create_directories():
     os.makedirs("images_secret", exist_ok=True)  # New secret images folder
     os.makedirs("cards_secret", exist_ok=True)   # New secret cards folder
 
-def check_existing_files(card_number, character_name):
-    """Check if normal or secret cards already exist"""
-    # Check for normal card
-    normal_card_filename = f"cards/{card_number:03d}_{character_name.replace(' ', '_')}.png"
-    normal_exists = os.path.exists(normal_card_filename)
-    
-    # Check for secret card
-    secret_card_filename = f"cards_secret/{card_number:03d}_card_secret.png"
-    secret_exists = os.path.exists(secret_card_filename)
-    
-    return normal_exists, secret_exists
+def card_filename(card_number, character_name):
+    number = catalog.champions.format_number(card_number)
+    return asset_path("cards", card_number, f"{number}_{character_name.replace(' ', '_')}{asset_encoding.output_extension()}")
+
+def secret_card_filename(card_number):
+    number = catalog.champions.format_number(card_number)
+    return asset_path("cards_secret", card_number, f"{number}_card_secret{asset_encoding.output_extension()}")
+
+def image_filename(card_number, character_name, ext):
+    """Where downloaded art for a card is saved (unnumbered art stays in images/)"""
+    name = character_name.replace(' ', '_')
+    if not card_number:
+        return f"images/{name}.{ext}"
+    return asset_path("images", card_number, f"{catalog.champions.format_number(card_number)}_{name}.{ext}")
 
-def parse_champion_info(champion_string):
-    """Parse champion string to extract number and name"""
-    match = re.match(r"#(\d+)\s+(.*)", champion_string)
-    if match:
-        number = match.group(1)
-        name = match.group(2)
-        return number, name
-    return None, None
+def secret_image_filename(card_number):
+    return asset_path("images_secret", card_number, f"{catalog.champions.format_number(card_number)}_secret.png")
 
 def clean_name_for_search(name):
     """Clean character name for search - this function removes parentheses for search purposes"""
@@ -68,47 +86,88 @@ def search_unsplash_image(character_name):
     except:
         return None
 
-def search_contest_wiki_image(character_name):
+def search_contest_wiki_image(character_name, number=None, log=print):
     """Try to find images from Marvel Contest of Champions wiki"""
     try:
+        memo = url_memo.get_memo()
+        headers = {'User-Agent': get_random_user_agent()}
+        
+        # A URL that worked before is tried first, on its own
+        known_url = memo.resolved_url(character_name)
+        if known_url:
+            try:
+                img_response = fetcher.get(known_url, headers=headers, timeout=10, stream=True)
+                status = img_response.status_code
+                if status == 200:
+                    image_path = save_image_from_response(img_response, character_name, number, known_url)
+                    if image_path:
+                        return image_path
+                img_response.close()
+                if status != 200 and not url_memo.is_definite_miss(status):
+                    return None  # transient error: keep the URL and try again next run
+                memo.forget(character_name)
+            except (requests.exceptions.RequestException, url_memo.TransientError):
+                return None
+        
         # Format character name for URL (replace spaces with underscores, handle special cases)
         url_name = format_name_for_wiki_url(character_name)
         
         # Construct the wiki page URL with the featured image
-        wiki_url = f"https://marvel-contestofchampions.fandom.com/wiki/{url_name}?file={url_name.replace('_', '+')}+featured.png"
-        
-        headers = {'User-Agent': get_random_user_agent()}
+        wiki_url = f"{WIKI_BASE_URL}/wiki/{url_name}?file={url_name.replace('_', '+')}+featured.png"
         
         # Check if the page exists
         try:
-            response = requests.head(wiki_url, headers=headers, timeout=10, allow_redirects=True)
+            response = fetcher.head(wiki_url, headers=headers, timeout=10, allow_redirects=True)
             if response.status_code == 200:
                 #print(f"  YES - {wiki_url}")
                 
                 # Try to download the direct image URL
                 # The actual image URL format is different from the page URL
-                image_url = f"https://static.wikia.nocookie.net/marvel-contestofchampions/images/featured/{url_name.replace('_', '+')}+featured.png"
+                image_url = f"{STATIC_BASE_URL}/marvel-contestofchampions/images/featured/{url_name.replace('_', '+')}+featured.png"
                 
                 # Try a few variations of the image URL
                 possible_urls = [
-                    f"https://static.wikia.nocookie.net/marvel-contestofchampions/images/featured/{url_name}+featured.png",
-                    f"https://static.wikia.nocookie.net/marvel-contestofchampions/images/{url_name}_featured.png",
-                    f"https://vignette.wikia.nocookie.net/marvel-contestofchampions/images/featured/{url_name}_featured.png"
+                    f"{STATIC_BASE_URL}/marvel-contestofchampions/images/featured/{url_name}+featured.png",
+                    f"{STATIC_BASE_URL}/marvel-contestofchampions/images/{url_name}_featured.png",
+                    f"{VIGNETTE_BASE_URL}/marvel-contestofchampions/images/featured/{url_name}_featured.png"
                 ]
                 
+                # Only 404/410 and undecodable images are remembered as failures
+                transient = False
                 for img_url in possible_urls:
+                    # Skip patterns that recently failed for this champion
+                    if memo.is_failed(img_url):
+                        continue
                     try:
-                        img_response = requests.get(img_url, headers=headers, timeout=10)
-                        if img_response.status_code == 200:
-                            return save_image_from_response(img_response, character_name)
+                        img_response = fetcher.get(img_url, headers=headers, timeout=10, stream=True)
+                        status = img_response.status_code
+                        if status == 200:
+                            image_path = save_image_from_response(img_response, character_name, number, img_url)
+                            if image_path:
+                                memo.record(character_name, img_url)
+                                return image_path
+                        img_response.close()
+                        if status == 200 or url_memo.is_definite_miss(status):
+                            memo.mark_failed(img_url)
+                        else:
+                            transient = True
                     except:
+                        transient = True
                         continue
                 
                 # If direct image download fails, try to scrape the page for the actual image URL
-                return scrape_wiki_page_for_image(wiki_url, character_name)
+                try:
+                    image_path = scrape_wiki_page_for_image(wiki_url, character_name, number, log)
+                except url_memo.TransientError:
+                    return None  # try again next run rather than remembering the champion as missing
+                if not image_path and not transient:
+                    memo.mark_missing(character_name)
+                return image_path
                 
             else:
                 #print(f"  NO - {wiki_url}")
+                if url_memo.is_definite_miss(response.status_code):
+                    memo.mark_missing(character_name)
                 return None
                 
         except requests.exceptions.RequestException:
@@ -121,76 +180,31 @@ def search_contest_wiki_image(character_name):
 
 def format_name_for_wiki_url(name):
     """Format character name for wiki URL"""
-    # Handle special character name mappings for the wiki FIRST
-    name_mappings = {
-        "Ægon": "Aegon",
-        "M.O.D.O.K.": "M.O.D.O.K.",
-        "Joe Fixit": "Joe_Fixit",
-        "Agent Venom": "Agent_Venom",
-        "Civil Warrior": "Civil_Warrior",
-        "Spider-Gwen": "Spider-Gwen",
-        "Spider-Man (Classic)": "Spider-Man_(Classic)",
-        "Spider-Man (Stark Enhanced)": "Spider-Man_(Stark_Enhanced)",
-        "Spider-Man (Stealth Suit)": "Spider-Man_(Stealth_Suit)",
-        "Captain America (Infinity War)": "Captain_America_(Infinity_War)",
-        "Captain America": "Captain_America",
-        "Captain Marvel (Classic)": "Captain_Marvel_(Classic)",  # Fixed this mapping
-        "Captain Marvel": "Captain_Marvel",
-        "Black Panther (Civil War)": "Black_Panther_(Civil_War)",
-        "Black Panther": "Black_Panther",
-        "Black Widow": "Black_Widow",
-        "Doctor Octopus": "Doctor_Octopus",
-        "Doctor Strange": "Doctor_Strange",
-        "Green Goblin": "Green_Goblin",
-        "Ghost Rider": "Ghost_Rider",
-        "Howard The Duck": "Howard_the_Duck",
-        "Hulk (Ragnarok)": "Hulk_(Ragnarok)",
-        "Iron Fist": "Iron_Fist",
-        "Iron Man (Infinity War)": "Iron_Man_(Infinity_War)",
-        "Luke Cage": "Luke_Cage",
-        "Magneto (Marvel Now!)": "Magneto_(House_of_X)",
-        "Proxima Midnight": "Proxima_Midnight",
-        "Red Hulk": "Red_Hulk",
-        "Red Skull": "Red_Skull",
-        "Rocket Raccoon": "Rocket_Raccoon",
-        "Scarlet Witch": "Scarlet_Witch",
-        "Star-Lord": "Star-Lord",
-        "Thor (Ragnarok)": "Thor_(Ragnarok)",
-        "Vision (Age of Ultron)": "Vision_(Age_of_Ultron)",
-        "War Machine": "War_Machine",
-        "Winter Soldier": "Winter_Soldier",
-        "Wolverine (X-23)": "Wolverine_(X-23)",
-        "Thor (Jane Foster)": "Thor_(Jane_Foster)",
-        "Ant Man": "Ant-Man",
-        "Corvus Glaive": "Corvus_Glaive",
-        "Cyclops (Blue Team)": "Cyclops_(Blue_Team)",
-        "Daredevil (Classic)": "Daredevil_(Classic)",
-        "Cull Obsidian": "Cull_Obsidian",
-        "Ebony Maw": "Ebony_Maw",
-        "Human Torch": "Human_Torch",
-        "Invisible Woman": "Invisible_Woman",
-        "Mister Sinister": "Mister_Sinister",
-        "Nick Fury": "Nick_Fury",
-        "She-Hulk": "She-Hulk",
-        "The Hood": "The_Hood",
-        "Wasp": "Wasp"
-    }
-    
-    # Check if we have a specific mapping for this exact name (including parentheses)
-    if name in name_mappings:
-        return name_mappings[name]
+    # Use the catalog's wiki slug for this exact name (including parentheses)
+    champion = catalog.champions.find_by_name(name)
+    if champion:
+        return champion.wiki_slug
     else:
         # If no exact mapping, format normally by replacing spaces with underscores
         # Keep parentheses and other special characters intact for the URL
         return name.replace(' ', '_')
 
-def scrape_wiki_page_for_image(wiki_url, character_name):
-    """Scrape the wiki page to find the actual image URL"""
+def scrape_wiki_page_for_image(wiki_url, character_name, number=None, log=print):
+    """Scrape the wiki page to find the actual image URL
+
+    Raises url_memo.TransientError when the page or image could not be
+    fetched for a reason that may go away (timeout, 429, 5xx).
+    """
     try:
         from bs4 import BeautifulSoup
         
         headers = {'User-Agent': get_random_user_agent()}
-        response = requests.get(wiki_url, headers=headers, timeout=10)
+        try:
+            response = fetcher.get(wiki_url, headers=headers, timeout=10)
+        except requests.exceptions.RequestException as e:
+            raise url_memo.TransientError(str(e)) from e
+        if response.status_code != 200 and not url_memo.is_definite_miss(response.status_code):
+            raise url_memo.TransientError(f"HTTP {response.status_code} for {wiki_url}")
         
         if response.status_code == 200:
             soup = BeautifulSoup(response.text, 'html.parser')
@@ -204,19 +218,83 @@ def scrape_wiki_page_for_image(wiki_url, character_name):
                     if src.startswith('//'):
                         src = 'https:' + src
                     elif src.startswith('/'):
-                        src = 'https://marvel-contestofchampions.fandom.com' + src
+                        src = WIKI_BASE_URL + src
                     
-                    return download_image_from_url(src, character_name)
+                    image_path = download_image_from_url(src, character_name, number, log)
+                    if image_path:
+                        url_memo.get_memo().record(character_name, src)
+                    return image_path
         
         return None
     except ImportError:
         #print("  BeautifulSoup not available for page scraping")
         return None
+    except url_memo.TransientError:
+        raise
     except Exception as e:
         #print(f"  Error scraping page: {e}")
         return None
 
-def save_image_from_response(response, character_name, number=None):
+# Largest artwork download accepted
+MAX_IMAGE_BYTES = 20 * 1024 * 1024
+
+# Leading bytes of the image formats we accept
+IMAGE_SIGNATURES = (b"\x89PNG\r\n\x1a\n", b"\xff\xd8\xff", b"GIF87a", b"GIF89a", b"RIFF")
+
+def stream_image_to_file(response, filename, max_bytes=MAX_IMAGE_BYTES):
+    """Stream an image response to filename, publishing it only once it is valid
+
+    The body is written in chunks to a temporary file next to filename while
+    the same chunks are fed to an incremental image parser, so a bad header,
+    oversized body or truncated image is caught without holding the body in
+    memory or reopening the file. Valid files are moved into place with an
+    atomic rename. Returns filename, or None if the download was rejected.
+    Raises url_memo.TransientError if the transfer broke off.
+    """
+    tmp_filename = f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+    parser = ImageFile.Parser()
+    header = b""
+    size = 0
+    try:
+        with open(tmp_filename, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                if not chunk:
+                    continue
+                size += len(chunk)
+                if size > max_bytes:
+                    return None
+                # Reject anything that does not start like an image
+                if len(header) < 8:
+                    header += chunk[:8]
+                    if len(header) >= 8 and not header.startswith(IMAGE_SIGNATURES):
+                        return None
+                parser.feed(chunk)
+                f.write(chunk)
+
+        # A body shorter than advertised means the transfer was cut off.
+        # Content-Length counts encoded bytes, so a gzip or deflate body
+        # (decoded by iter_content) cannot be compared with it.
+        expected_size = response.headers.get('content-length')
+        encoding = response.headers.get('content-encoding', 'identity').lower()
+        if encoding == 'identity' and expected_size and expected_size.isdigit() and int(expected_size) != size:
+            raise url_memo.TransientError(f"got {size} of {expected_size} bytes")
+
+        # Raises if the image is incomplete or could not be decoded
+        parser.close()
+        os.replace(tmp_filename, filename)
+        return filename
+    except url_memo.TransientError:
+        raise
+    except requests.exceptions.RequestException as e:
+        raise url_memo.TransientError(str(e)) from e
+    except Exception:
+        return None
+    finally:
+        response.close()
+        if os.path.exists(tmp_filename):
+            os.remove(tmp_filename)
+
+def save_image_from_response(response, character_name, number=None, url=None):
     """Save image from HTTP response"""
     try:
         # Determine file extension from content type
@@ -228,32 +306,36 @@ def save_image_from_response(response, character_name, number=None):
         else:
             ext = 'png'  # Default
         
-        number_str = f"{number:03d}_" if number else ""
-        filename = f"images/{number_str}{character_name.replace(' ', '_')}.{ext}"
+        filename = image_filename(number, character_name, ext)
         
-        with open(filename, 'wb') as f:
-            f.write(response.content)
-        
-        # Verify the image is valid
-        try:
-            img = Image.open(filename)
-            img.verify()
-            #print(f"    Downloaded image: {filename}")
-            return filename
-        except:
-            os.remove(filename)
-            #print(f"    Invalid image file, removed")
+        # Stream to disk, verifying the image as it arrives
+        if not stream_image_to_file(response, filename):
+            #print(f"    Invalid image file, discarded")
             return None
+        
+        if url:
+            fetcher.remember(url, response, filename)
+        #print(f"    Downloaded image: {filename}")
+        return filename
             
+    except url_memo.TransientError:
+        raise
     except Exception as e:
         #print(f"    Error saving image: {e}")
         return None
 
-def download_image_from_url(url, character_name, number=None):
-    """Download image from direct URL"""
+def download_image_from_url(url, character_name, number=None, log=print):
+    """Download image from direct URL
+
+    Raises url_memo.TransientError for failures that may go away on retry.
+    """
     try:
         headers = {'User-Agent': get_random_user_agent()}
-        response = requests.get(url, headers=headers, timeout=15)
+        try:
+            response = fetcher.get(url, headers=headers, timeout=15, stream=True)
+        except requests.exceptions.RequestException as e:
+            log(f"Failed to download image for {character_name}: {e}")
+            raise url_memo.TransientError(str(e)) from e
         
         if response.status_code == 200:
             # Determine file extension
@@ -265,42 +347,94 @@ def download_image_from_url(url, character_name, number=None):
             else:
                 ext = 'jpg'  # Default
             
-            number_str = f"{number:03d}_" if number else ""
-            filename = f"images/{number_str}{character_name.replace(' ', '_')}.{ext}"
+            filename = image_filename(number, character_name, ext)
             
-            with open(filename, 'wb') as f:
-                f.write(response.content)
-            
-            # Verify the image is valid
-            try:
-                img = Image.open(filename)
-                img.verify()
+            # Stream to disk, verifying the image as it arrives
+            if stream_image_to_file(response, filename):
+                fetcher.remember(url, response, filename)
                 #print(f"Downloaded image for {character_name}")
                 return filename
-            except:
-                os.remove(filename)
-                return None
+            return None
+        response.close()
+        if not url_memo.is_definite_miss(response.status_code):
+            raise url_memo.TransientError(f"HTTP {response.status_code} for {url}")
+    except url_memo.TransientError:
+        raise
     except Exception as e:
-        print(f"Failed to download image for {character_name}: {e}")
+        log(f"Failed to download image for {character_name}: {e}")
     
     return None
 
+# Bump when the card layout or drawing code changes so existing cards get rebuilt
+CARD_RENDERER_VERSION = 1
+
+# Card dimensions: 2.5" x 3.5" at 300 DPI
+CARD_WIDTH = int(2.5 * 300)  # 750 pixels
+CARD_HEIGHT = int(3.5 * 300)  # 1050 pixels
+
+@functools.lru_cache(maxsize=None)
+def load_font(size):
+    """Load the card font at the given size once per process"""
+    try:
+        return ImageFont.truetype("arial.ttf", size)
+    except:
+        # Fallback to default font
+        return ImageFont.load_default()
+
+@functools.lru_cache(maxsize=None)
+def card_template():
+    """Blank white card with its border, built once and copied for each card"""
+    card = Image.new('RGB', (CARD_WIDTH, CARD_HEIGHT), 'white')
+    draw = ImageDraw.Draw(card)
+    
+    # Add border
+    border_width = 10
+    draw.rectangle(
+        [border_width, border_width, CARD_WIDTH - border_width, CARD_HEIGHT - border_width],
+        outline='black',
+        width=3
+    )
+    return card
+
+@functools.lru_cache(maxsize=None)
+def placeholder_template():
+    """Placeholder background with border and "MARVEL CHAMPIONS" text, built once"""
+    # Create a 400x600 placeholder image
+    img = Image.new('RGB', (400, 600), color='#1e3a8a')  # Marvel blue
+    draw = ImageDraw.Draw(img)
+    
+    # Add Marvel-style design
+    draw.rectangle([20, 20, 380, 580], outline='#ff0000', width=3)  # Red border
+    
+    # Add "MARVEL CHAMPIONS" text
+    font_small = load_font(24)
+    marvel_text = "MARVEL CHAMPIONS"
+    bbox = draw.textbbox((0, 0), marvel_text, font=font_small)
+    x = (400 - (bbox[2] - bbox[0])) // 2
+    draw.text((x, 350), marvel_text, fill='#ffcc00', font=font_small)  # Gold text
+    return img
+
+def composite_onto_card(card, char_image, position):
+    """Alpha-blend an RGBA image onto the RGB card in place
+
+    Only the pasted image's bounding box is converted to RGBA and blended,
+    instead of the whole card, with the same result as compositing the full
+    frame over white.
+    """
+    x, y = position
+    box = (x, y, x + char_image.width, y + char_image.height)
+    region = card.crop(box).convert('RGBA')
+    region.paste(char_image, (0, 0), char_image)
+    region = Image.alpha_composite(Image.new('RGBA', region.size, 'white'), region)
+    card.paste(region.convert('RGB'), box)
+
 def generate_placeholder_image(character_name, number):
     """Generate a placeholder image with character info"""
     try:
-        # Create a 400x600 placeholder image
-        img = Image.new('RGB', (400, 600), color='#1e3a8a')  # Marvel blue
+        # Start from the prebuilt placeholder background
+        img = placeholder_template().copy()
         draw = ImageDraw.Draw(img)
-        
-        try:
-            font_large = ImageFont.truetype("arial.ttf", 32)
-            font_small = ImageFont.truetype("arial.ttf", 24)
-        except:
-            font_large = ImageFont.load_default()
-            font_small = ImageFont.load_default()
-        
-        # Add Marvel-style design
-        draw.rectangle([20, 20, 380, 580], outline='#ff0000', width=3)  # Red border
+        font_large = load_font(32)
         
         # Add character name
         lines = character_name.split(' ')
@@ -324,14 +458,8 @@ def generate_placeholder_image(character_name, number):
             x = (400 - (bbox[2] - bbox[0])) // 2
             draw.text((x, 270), text, fill='white', font=font_large)
         
-        # Add "MARVEL CHAMPIONS" text
-        marvel_text = "MARVEL CHAMPIONS"
-        bbox = draw.textbbox((0, 0), marvel_text, font=font_small)
-        x = (400 - (bbox[2] - bbox[0])) // 2
-        draw.text((x, 350), marvel_text, fill='#ffcc00', font=font_small)  # Gold text
-        
         # Save placeholder
-        filename = f"images/{number:03d}_{character_name.replace(' ', '_')}_placeholder.png"
+        filename = image_filename(number, f"{character_name}_placeholder", "png")
         img.save(filename)
         #print(f"Generated placeholder for {character_name}")
         return filename
@@ -340,95 +468,177 @@ def generate_placeholder_image(character_name, number):
         #print(f"Failed to generate placeholder for {character_name}: {e}")
         return None
 
-def download_image(character_name, number):
+def use_asset_pack(path):
+    """Switch to offline mode: take source art from an asset pack, never the network
+
+    Raises ValueError if the pack is missing or is not a readable zip.
+    """
+    global offline_pack
+    try:
+        offline_pack = asset_pack.open_pack(path) if path else None
+    except (OSError, ValueError, zipfile.BadZipFile) as e:
+        raise ValueError(f"cannot open asset pack {path}: {e}") from e
+    return offline_pack
+
+def source_exists(source):
+    """Check that a source image path (or asset pack reference) exists"""
+    if not source:
+        return False
+    if asset_pack.is_pack_ref(source):
+        pack_path, number = asset_pack.parse_pack_ref(source)
+        return number in asset_pack.open_pack(pack_path)
+    return os.path.exists(source)
+
+def open_source_image(source):
+    """Open a source image from disk or, for pack references, from the mapped pack"""
+    if asset_pack.is_pack_ref(source):
+        pack_path, number = asset_pack.parse_pack_ref(source)
+        return Image.open(asset_pack.open_pack(pack_path).open(number))
+    return Image.open(source)
+
+def download_image(character_name, number, log=print):
     """Try to get character image from Contest of Champions wiki"""
+    # Offline mode: the asset pack is the only source of art
+    if offline_pack is not None:
+        if number in offline_pack:
+            return offline_pack.ref(number)
+        return generate_placeholder_image(character_name, number)
+    
     #print(f"  Checking Contest of Champions wiki for {character_name}...")
     
-    # Try Contest of Champions wiki first
-    image_path = search_contest_wiki_image(character_name)
-    if image_path:
-        return image_path
+    # Try Contest of Champions wiki first (unless we already know it has no art)
+    if not url_memo.get_memo().is_missing(character_name):
+        image_path = search_contest_wiki_image(character_name, number, log)
+        if image_path:
+            return image_path
     
     # If no image found, generate a placeholder
     #print(f"  No image found, generating placeholder for {character_name}")
     return generate_placeholder_image(character_name, number)
 
-def create_secret_image(original_image_path, character_name, number):
-    """Create a blacked out and blurred version of the character image"""
-    if not original_image_path or not os.path.exists(original_image_path):
+# Character art is drawn on the card at twice its size (256x256 -> 512x512)
+ART_SCALE = 2
+
+# Secret silhouettes: saved size (drawn on the card at ART_SCALE times
+# this) and blur strength at that size
+SECRET_IMAGE_SIZE = (300, 300)
+SECRET_BLUR_RADIUS = 3
+
+def scaled_size(size):
+    return (size[0] * ART_SCALE, size[1] * ART_SCALE)
+
+def load_source_art(image_path):
+    """Decode source art once as RGBA, shared by the normal and secret card"""
+    if not source_exists(image_path):
         return None
-    
+    with open_source_image(image_path) as img:
+        return img.convert('RGBA') if img.mode != 'RGBA' else img.copy()
+
+def card_art(source):
+    """Source art resampled once, straight to its on-card size"""
+    return source.resize(scaled_size(source.size), Image.Resampling.LANCZOS)
+
+def secret_silhouette(source):
+    """Black silhouette of the source art at its on-card size
+
+    Only the alpha channel is resampled (once, straight to the card size)
+    and gaussian blurred; the color channels are solid black. The saved
+    secret image is derived from this same buffer (secret_image).
+    """
+    size = scaled_size(SECRET_IMAGE_SIZE)
+    alpha = source.getchannel('A').resize(size, Image.Resampling.LANCZOS)
+    alpha = alpha.filter(ImageFilter.GaussianBlur(radius=SECRET_BLUR_RADIUS * ART_SCALE))
+    silhouette = Image.new('RGBA', size, (0, 0, 0, 255))
+    silhouette.putalpha(alpha)
+    return silhouette
+
+def secret_image(silhouette):
+    """The 300x300 secret image, downscaled from the on-card silhouette
+
+    The silhouette is already blurred, so a plain 2x2 average is enough.
+    """
+    alpha = silhouette.getchannel('A').reduce(ART_SCALE)
+    image = Image.new('RGBA', SECRET_IMAGE_SIZE, (0, 0, 0, 255))
+    image.putalpha(alpha)
+    return image
+
+def save_secret_image(silhouette, number):
+    """Save a secret silhouette to images_secret/, returns its filename"""
+    secret_filename = secret_image_filename(number)
+    # Black silhouette: stored as grayscale + alpha, deduplicated
+    asset_encoding.save_compact(secret_image(silhouette), secret_filename, keep_png=True)
+    #print(f"    Created secret image: {secret_filename}")
+    return secret_filename
+
+def create_secret_image(original_image_path, character_name, number, source=None, silhouette=None):
+    """Create a blacked out and blurred version of the character image
+
+    Pass the on-card `silhouette` when the secret card is rendered too, so
+    both come from one resample and blur.
+    """
     try:
-        # Open the original image
-        img = Image.open(original_image_path)
-        
-        # Convert to RGBA if not already
-        if img.mode != 'RGBA':
-            img = img.convert('RGBA')
-        
-        # Resize to 300x300 to accommodate blur without cutoff
-        img = img.resize((300, 300), Image.Resampling.LANCZOS)
-        
-        # Create a copy for the secret version
-        secret_img = img.copy()
-        
-        # Create a black overlay that preserves the alpha channel
-        black_overlay = Image.new('RGBA', secret_img.size, (0, 0, 0, 255))
-        
-        # Get the alpha channel from the original image
-        if secret_img.mode == 'RGBA':
-            # Extract alpha channel
-            alpha = secret_img.split()[-1]
-            
-            # Apply the black overlay but keep the original alpha shape
-            black_overlay.putalpha(alpha)
-            secret_img = black_overlay
-        else:
-            # If no alpha channel, just make it black
-            secret_img = black_overlay
-        
-        # Apply gaussian blur for mystery effect
-        secret_img = secret_img.filter(ImageFilter.GaussianBlur(radius=3))
-        
-        # Save the secret image
-        # Get the extension from the original file
-        _, ext = os.path.splitext(original_image_path)
-        secret_filename = f"images_secret/{number:03d}_secret.png"
-        
-        secret_img.save(secret_filename)
-        #print(f"    Created secret image: {secret_filename}")
-        return secret_filename
+        if silhouette is None:
+            if source is None:
+                source = load_source_art(original_image_path)
+            if source is None:
+                return None
+            silhouette = secret_silhouette(source)
+        return save_secret_image(silhouette, number)
         
     except Exception as e:
         #print(f"    Error creating secret image for {character_name}: {e}")
         return None
 
-def create_trading_card(number, character_name, image_path=None):
-    """Create a 2.5" x 3.5" trading card"""
-    # Convert inches to pixels (300 DPI)
-    width = int(2.5 * 300)  # 750 pixels
-    height = int(3.5 * 300)  # 1050 pixels
+def rebuild_secret_assets(numbers, jobs=1):
+    """Regenerate every secret image and secret card for the given cards
+
+    Goes through render_card like a normal build, so each card's secret
+    image and secret card come from one silhouette, and the work is spread
+    over `jobs` worker processes.
+    """
+    create_directories()
+    inventory = AssetInventory(numbers=numbers)
+    sources = []
+    for card_number in sorted(set(numbers)):
+        champion = catalog.champions.get(card_number)
+        if champion:
+            image_path = inventory.source_image(card_number)
+            if offline_pack is not None and card_number in offline_pack:
+                image_path = offline_pack.ref(card_number)
+            sources.append((card_number, champion.name, image_path, False, True))
     
-    # Create blank card with white background
-    card = Image.new('RGB', (width, height), 'white')
-    draw = ImageDraw.Draw(card)
+    if jobs > 1:
+        with render_executor(jobs) as executor:
+            rendered = list(executor.map(render_card, *zip(*sources)))
+    else:
+        rendered = [render_card(*args) for args in sources]
     
-    # Add border
-    border_width = 10
-    draw.rectangle(
-        [border_width, border_width, width - border_width, height - border_width],
-        outline='black',
-        width=3
-    )
+    manifest = BuildManifest()
+    count = 0
+    for (number, name, image_path, _, _), (error, _) in zip(sources, rendered):
+        if not error:
+            manifest.record(secret_card_filename(number), card_inputs(manifest, number, name, image_path, True))
+            count += 1
+    manifest.save()
+    return count
+
+def create_trading_card(number, character_name, image_path=None, save=True, art=None, log=print):
+    """Create a 2.5" x 3.5" trading card
+
+    art is the character art already at its on-card size (card_art);
+    without it the art is loaded from image_path. With save=False nothing
+    is written; the encoded PNG bytes are returned.
+    """
+    width = CARD_WIDTH
+    height = CARD_HEIGHT
     
-    try:
-        # Try to load different font sizes - DOUBLED the title font size!
-        title_font = ImageFont.truetype("arial.ttf", 56)  # Much larger for impact!
-        number_font = ImageFont.truetype("arial.ttf", 24)
-    except:
-        # Fallback to default font
-        title_font = ImageFont.load_default()
-        number_font = ImageFont.load_default()
+    # Start from a copy of the prebuilt bordered blank card
+    card = card_template().copy()
+    draw = ImageDraw.Draw(card)
+    
+    # Fonts are loaded once and reused across cards
+    title_font = load_font(56)
+    number_font = load_font(24)
     
     # Handle long character names by splitting into lines (adjusted spacing for larger font)
     lines = []
@@ -458,19 +668,10 @@ def create_trading_card(number, character_name, image_path=None):
     img_area_height = height - img_start_y - 80  # Leave space for number
     
     # Add character image if available (optimized for 256x256 transparent PNGs)
-    if image_path and os.path.exists(image_path):
+    if art is not None or source_exists(image_path):
         try:
-            # Open the character image
-            char_image = Image.open(image_path)
-            
-            # Verify it has transparency (RGBA mode)
-            if char_image.mode != 'RGBA':
-                # Convert to RGBA to preserve any transparency
-                char_image = char_image.convert('RGBA')
-            
-            # Scale the image 2x (256x256 → 512x512)
-            scaled_size = (char_image.width * 2, char_image.height * 2)
-            char_image = char_image.resize(scaled_size, Image.Resampling.LANCZOS)
+            # Character art scaled 2x (256x256 → 512x512), RGBA to preserve transparency
+            char_image = art if art is not None else card_art(load_source_art(image_path))
             
             # Calculate center position for the scaled image
             img_x = (width - char_image.width) // 2  # Center horizontally
@@ -485,70 +686,49 @@ def create_trading_card(number, character_name, image_path=None):
             if img_y + char_image.height > height - 80:
                 img_y = height - 80 - char_image.height
             
-            # Convert card to RGBA temporarily to properly handle transparency
-            card_rgba = card.convert('RGBA')
-            
             # Paste the character image with transparency preserved
-            card_rgba.paste(char_image, (img_x, img_y), char_image)
-            
-            # Convert back to RGB for final card
-            card = Image.alpha_composite(Image.new('RGBA', card_rgba.size, 'white'), card_rgba).convert('RGB')
-            
-            # Recreate draw object since we replaced the card
-            draw = ImageDraw.Draw(card)
+            composite_onto_card(card, char_image, (img_x, img_y))
             
         except Exception as e:
-            print(f"  Error adding image to card for {character_name}: {e}")
+            log(f"  Error adding image to card for {character_name}: {e}")
     
     # Add number at bottom right in ###/100 format
-    number_text = f"{number:03d}/100"  # Format as 001/100, 002/100, etc.
+    number_text = catalog.champions.label(number)  # Format as 001/100, 002/100, etc.
     bbox = draw.textbbox((0, 0), number_text, font=number_font)
     text_width = bbox[2] - bbox[0]
     x = width - text_width - 30
     y = height - 50
     draw.text((x, y), number_text, fill='black', font=number_font)
     
+    if not save:
+        return encode_card(card)
+    
     # Save the card
-    filename = f"cards/{number:03d}_{character_name.replace(' ', '_')}.png"
-    card.save(filename, 'PNG', dpi=(300, 300))
+    filename = card_filename(number, character_name)
+    asset_encoding.save_image(card, filename, dpi=(300, 300))
     #print(f"  Created card: {filename}")
 
 def redact_character_name(name):
     """Replace A-Z letters with _ (underscores) while preserving spaces and punctuation"""
-    redacted = ""
-    for char in name:
-        if char.isalpha():  # Replace any letter (A-Z, a-z) with redaction block
-            redacted += "_ "  # Add space after each underscore
-        else:
-            redacted += char  # Keep spaces, parentheses, hyphens, etc.
-    return redacted.rstrip()  # Remove trailing space
+    return catalog.redact_name(name)
+
+def create_secret_trading_card(number, character_name, secret_image_path=None, save=True, silhouette=None, log=print):
+    """Create a mystery trading card with redacted character name
 
-def create_secret_trading_card(number, character_name, secret_image_path=None):
-    """Create a mystery trading card with redacted character name"""
-    # Convert inches to pixels (300 DPI)
-    width = int(2.5 * 300)  # 750 pixels
-    height = int(3.5 * 300)  # 1050 pixels
+    silhouette is the secret image already at its on-card size
+    (secret_silhouette); without it the saved secret image is scaled 2x.
+    With save=False nothing is written; the encoded PNG bytes are returned.
+    """
+    width = CARD_WIDTH
+    height = CARD_HEIGHT
     
-    # Create blank card with white background
-    card = Image.new('RGB', (width, height), 'white')
+    # Start from a copy of the prebuilt bordered blank card
+    card = card_template().copy()
     draw = ImageDraw.Draw(card)
     
-    # Add border
-    border_width = 10
-    draw.rectangle(
-        [border_width, border_width, width - border_width, height - border_width],
-        outline='black',
-        width=3
-    )
-    
-    try:
-        # Try to load different font sizes - same as regular cards but smaller for redacted text
-        title_font = ImageFont.truetype("arial.ttf", 56)  # Same size as regular cards
-        number_font = ImageFont.truetype("arial.ttf", 24)
-    except:
-        # Fallback to default font
-        title_font = ImageFont.load_default()
-        number_font = ImageFont.load_default()
+    # Fonts are loaded once and reused across cards
+    title_font = load_font(56)
+    number_font = load_font(24)
     
     # Create redacted version of character name
     redacted_name = redact_character_name(character_name)
@@ -581,18 +761,14 @@ def create_secret_trading_card(number, character_name, secret_image_path=None):
     img_area_height = height - img_start_y - 80
     
     # Add the secret (blacked out) character image if available
-    if secret_image_path and os.path.exists(secret_image_path):
+    if silhouette is not None or (secret_image_path and os.path.exists(secret_image_path)):
         try:
-            # Open the secret character image
-            char_image = Image.open(secret_image_path)
-            
-            # Verify it has transparency (RGBA mode)
-            if char_image.mode != 'RGBA':
-                char_image = char_image.convert('RGBA')
-            
-            # Scale the image 2x (same as regular cards)
-            scaled_size = (char_image.width * 2, char_image.height * 2)
-            char_image = char_image.resize(scaled_size, Image.Resampling.LANCZOS)
+            char_image = silhouette
+            if char_image is None:
+                with Image.open(secret_image_path) as saved:
+                    char_image = saved.convert('RGBA')
+                # Scale the image 2x (same as regular cards)
+                char_image = char_image.resize(scaled_size(char_image.size), Image.Resampling.LANCZOS)
             
             # Calculate center position
             img_x = (width - char_image.width) // 2
@@ -605,62 +781,426 @@ def create_secret_trading_card(number, character_name, secret_image_path=None):
             if img_y + char_image.height > height - 80:
                 img_y = height - 80 - char_image.height
             
-            # Convert card to RGBA temporarily to handle transparency
-            card_rgba = card.convert('RGBA')
-            card_rgba.paste(char_image, (img_x, img_y), char_image)
-            card = Image.alpha_composite(Image.new('RGBA', card_rgba.size, 'white'), card_rgba).convert('RGB')
-            
-            # Recreate draw object
-            draw = ImageDraw.Draw(card)
+            # Paste the secret image with transparency preserved
+            composite_onto_card(card, char_image, (img_x, img_y))
             
         except Exception as e:
-            print(f"  Error adding secret image to card: {e}")
+            log(f"  Error adding secret image to card: {e}")
     
     # Add number at bottom right in ###/100 format
-    number_text = f"{number:03d}/100"
+    number_text = catalog.champions.label(number)
     bbox = draw.textbbox((0, 0), number_text, font=number_font)
     text_width = bbox[2] - bbox[0]
     x = width - text_width - 30
     y = height - 50
     draw.text((x, y), number_text, fill='black', font=number_font)
     
+    # Secret cards are pure grayscale, so PNG profiles store them in L mode
+    if not save:
+        return asset_encoding.encode_compact(card, dpi=(300, 300))
+    
     # Save the secret card with redacted name in filename
     redacted_filename = redact_character_name(character_name).replace(' ', '_')
-    filename = f"cards_secret/{number:03d}_card_secret.png"
-    card.save(filename, 'PNG', dpi=(300, 300))
+    filename = secret_card_filename(number)
+    asset_encoding.save_compact(card, filename, dpi=(300, 300))
     #print(f"  Created secret card: {filename}")
 
 def read_unlocks_file(filename="unlocks.txt"):
     """Read the unlocks file and return a set of unlocked card numbers"""
-    unlocked_cards = set()
+    store = UnlockStore(filename)
     
     try:
-        with open(filename, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line:  # Skip empty lines
-                    parts = line.split()
-                    if len(parts) >= 2:
-                        card_num = parts[0]
-                        status = parts[1].upper()
-                        if status == "YES":
-                            # Remove leading zeros and convert to int for comparison
-                            unlocked_cards.add(int(card_num))
+        if not store.exists():
+            #print(f"Warning: {filename} not found. Generating all cards...")
+            return set(catalog.champions.numbers())  # Generate all cards if file doesn't exist
         
+        unlocked_cards = store.unlocked_numbers()
         #print(f"Found {len(unlocked_cards)} unlocked cards in {filename}")
         return unlocked_cards
         
-    except FileNotFoundError:
-        #print(f"Warning: {filename} not found. Generating all cards...")
-        return set(range(1, 101))  # Generate all cards if file doesn't exist
     except Exception as e:
         #print(f"Error reading {filename}: {e}")
         #print("Generating all cards as fallback...")
-        return set(range(1, 101))
+        return set(catalog.champions.numbers())
 
-def main():
-    """Main function to generate all trading cards"""
+def source_inventory():
+    """Inventory of images/ for this process, scanned on first use
+
+    Long-running callers (the card server's render workers) look source
+    art up here instead of listing images/ for every card. Images this
+    process downloads are added to it.
+    """
+    global _source_inventory
+    if _source_inventory is None:
+        _source_inventory = AssetInventory({"image": ASSET_DIRECTORIES["image"]})
+    return _source_inventory
+
+def source_kind(path):
+    """Inventory kind of a file in images/"""
+    return "placeholder" if path.endswith("_placeholder.png") else "image"
+
+def find_existing_image(card_number, inventory=None):
+    """Find a previously downloaded image (or placeholder) for a champion"""
+    if inventory is None:
+        inventory = source_inventory()
+    return inventory.source_image(card_number)
+
+def encode_card(card):
+    """Encode a finished card the same way it is saved to disk"""
+    return asset_encoding.encode_image(card, dpi=(300, 300))
+
+def render_card_bytes(card_number, secret=False, inventory=None):
+    """Render one card in memory and return its PNG bytes (render-on-demand)
+
+    Source art is taken from the asset pack in offline mode, else from
+    images/ (looked up in `inventory`, by default source_inventory()), and
+    fetched (or replaced by a placeholder) when missing. No card file is
+    written.
+    """
+    champion = catalog.champions.get(card_number)
+    if not champion:
+        raise ValueError(f"no card {catalog.champions.format_number(card_number)}")
+    if inventory is None:
+        inventory = source_inventory()
+    image_path = find_existing_image(card_number, inventory)
+    if offline_pack is not None and card_number in offline_pack:
+        image_path = offline_pack.ref(card_number)
+    if not source_exists(image_path):
+        if image_path:
+            inventory.remove(card_number, source_kind(image_path), image_path)
+        image_path = download_image(champion.name, card_number)
+        if image_path and not asset_pack.is_pack_ref(image_path):
+            inventory.add(card_number, source_kind(image_path), image_path)
+    source = load_source_art(image_path)
+    if secret:
+        silhouette = secret_silhouette(source) if source is not None else None
+        return create_secret_trading_card(card_number, champion.name, save=False, silhouette=silhouette)
+    art = card_art(source) if source is not None else None
+    return create_trading_card(card_number, champion.name, image_path, save=False, art=art)
+
+def render_card(card_number, character_name, image_path, render_normal=True, render_secret=True):
+    """Render the normal and/or secret card for one champion
+
+    Runs in a worker process when building in parallel, so it only touches
+    local files and prints nothing. The source art is decoded once, and each
+    card's art is resampled from it once, straight to its on-card size.
+    Returns (error message or None, warnings logged while rendering).
+    """
+    warnings = []
+    try:
+        try:
+            source = load_source_art(image_path)
+        except Exception:
+            source = None  # the card renderers report unreadable art
+        
+        if render_normal:
+            # Create regular trading card
+            art = card_art(source) if source is not None else None
+            create_trading_card(card_number, character_name, image_path, art=art, log=warnings.append)
+        
+        if render_secret:
+            # Create secret version of the image and the secret trading card
+            silhouette = None
+            if source is not None:
+                silhouette = secret_silhouette(source)
+                create_secret_image(image_path, character_name, card_number, silhouette=silhouette)
+            create_secret_trading_card(card_number, character_name, silhouette=silhouette, log=warnings.append)
+        return None, warnings
+    except Exception as e:
+        return str(e), warnings
+
+def source_hash(manifest, source):
+    """Content hash of a source image path or asset pack reference"""
+    if asset_pack.is_pack_ref(source):
+        pack_path, number = asset_pack.parse_pack_ref(source)
+        return asset_pack.open_pack(pack_path).member_hash(number)
+    return manifest.file_hash(source)
+
+def card_inputs(manifest, card_number, character_name, image_path, secret=False):
+    """Everything a card's output depends on, as recorded in the build manifest"""
+    font_path = getattr(load_font(56), "path", None)
+    if not isinstance(font_path, str):
+        font_path = None  # Pillow's built-in default font
+    inputs = {
+        "renderer": CARD_RENDERER_VERSION,
+        "font": manifest.file_hash(font_path) if font_path else "default",
+        "source": source_hash(manifest, image_path),
+        "name": character_name,
+        "size": [CARD_WIDTH, CARD_HEIGHT],
+        "encoder": asset_encoding.profile_name(),
+    }
+    if secret:
+        inputs["secret"] = {"size": list(SECRET_IMAGE_SIZE), "card_size": list(scaled_size(SECRET_IMAGE_SIZE)),
+                            "blur_radius": SECRET_BLUR_RADIUS * ART_SCALE}
+    return inputs
+
+def generate_cards(numbers, jobs=1, fetch_workers=8, progress=None, executor=None, secret_only=False,
+                   log=print):
+    """Generate cards for the given card numbers only
+
+    A card is rebuilt only when the build manifest shows that its source
+    image, renderer version, font or parameters changed (or the output is
+    missing). Images are fetched concurrently on a thread pool (politeness
+    is handled by the per-host rate limiter in fetcher) while rendering is
+    spread over a pool of `jobs` worker processes. Results come back in card
+    number order as (card_number, character_name, status, error) tuples,
+    where status is "generated", "skipped" or "failed". `progress` is called
+    with each result as it is collected. A long-running caller can pass its
+    own `executor` to keep the worker processes (and their loaded fonts and
+    templates) warm between calls. With secret_only, only the secret cards
+    are built (for cards that are still locked). Download errors and
+    rendering warnings go to `log` (print by default).
+    """
+    create_directories()
+    manifest = BuildManifest()
+    inventory = AssetInventory(numbers=numbers)
+    
+    plan = []
+    for card_number in sorted(set(numbers)):
+        champion = catalog.champions.get(card_number)
+        if champion:
+            character_name = champion.name
+            image_path = inventory.source_image(card_number)
+            if offline_pack is not None and card_number in offline_pack:
+                image_path = offline_pack.ref(card_number)
+            # Check which outputs are stale
+            normal_file = card_filename(card_number, character_name)
+            normal_fresh = secret_only or (inventory.contains(card_number, "card", normal_file) and
+                            manifest.matches(normal_file, card_inputs(manifest, card_number, character_name, image_path)))
+            secret_file = secret_card_filename(card_number)
+            secret_fresh = (inventory.contains(card_number, "card_secret", secret_file) and
+                            manifest.matches(secret_file, card_inputs(manifest, card_number, character_name, image_path, True)))
+            plan.append((card_number, character_name, image_path, normal_fresh, secret_fresh))
+    
+    # Download images or create placeholders (only for stale cards without real art)
+    to_fetch = []
+    for card_number, character_name, image_path, normal_fresh, secret_fresh in plan:
+        if normal_fresh and secret_fresh:
+            continue
+        if image_path is None or (not normal_fresh and image_path.endswith("_placeholder.png")):
+            to_fetch.append((character_name, card_number))
+    fetches = dict(zip((number for _, number in to_fetch),
+                       fetcher.fetch_all(functools.partial(download_image, log=log), to_fetch, fetch_workers)))
+    
+    own_executor = executor is None and jobs > 1
+    if own_executor:
+        executor = render_executor(jobs)
+    
+    pending = []
+    try:
+        for card_number, character_name, image_path, normal_fresh, secret_fresh in plan:
+            if normal_fresh and secret_fresh:
+                pending.append((card_number, character_name, None, None, None))
+                continue
+            
+            if card_number in fetches:
+                try:
+                    image_path = fetches[card_number].result() or image_path
+                except Exception:
+                    pass
+            
+            outputs = {}
+            if not normal_fresh:
+                outputs[card_filename(card_number, character_name)] = card_inputs(
+                    manifest, card_number, character_name, image_path)
+            if not secret_fresh:
+                outputs[secret_card_filename(card_number)] = card_inputs(
+                    manifest, card_number, character_name, image_path, True)
+            
+            args = (card_number, character_name, image_path, not normal_fresh, not secret_fresh)
+            if executor:
+                pending.append((card_number, character_name, outputs, executor.submit(render_card, *args), None))
+            else:
+                pending.append((card_number, character_name, outputs, None, render_card(*args)))
+        
+        results = []
+        for card_number, character_name, outputs, future, rendered in pending:
+            if future is not None:
+                try:
+                    rendered = future.result()
+                except Exception as e:
+                    rendered = (str(e), [])
+            error = None
+            if rendered is not None:
+                error, warnings = rendered
+                for warning in warnings:
+                    log(warning)
+                error = error or ""
+            
+            if error is None:
+                result = (card_number, character_name, "skipped", None)
+            elif error:
+                result = (card_number, character_name, "failed", error)
+            else:
+                result = (card_number, character_name, "generated", None)
+                for output_path, inputs in outputs.items():
+                    manifest.record(output_path, inputs)
+            
+            results.append(result)
+            if progress:
+                progress(result)
+        return results
+    finally:
+        if own_executor:
+            executor.shutdown()
+        manifest.save()
+        fetcher.flush_cache()
+
+def render_executor(jobs, initializer=None, initargs=()):
+    """Process pool for the renderers, using this process's encoder profile
+
+    Workers start from a forkserver where the platform has one. The caller
+    may already be running fetch or server threads, and a child forked from
+    a threaded process can hang on a lock (such as PIL's plugin import
+    lock) that another thread held at the time of the fork.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    if initializer is None:
+        initializer, initargs = asset_encoding.set_profile, (asset_encoding.profile_name(),)
+    context = None
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+    return ProcessPoolExecutor(max_workers=jobs, mp_context=context,
+                               initializer=initializer, initargs=initargs)
+
+# Watch mode: quiet time that ends a burst of changes, and the longest a
+# burst may hold back a rebuild
+WATCH_DEBOUNCE = 0.5
+WATCH_MAX_DELAY = 5.0
+
+def changed_card_numbers(paths, directory="images"):
+    """Card numbers whose source art is among the changed paths (None for all)"""
+    numbers = set()
+    directory = os.path.normpath(directory)
+    for path in paths:
+        if path == directory:
+            return None  # events were lost: treat every card as changed
+        if not path.startswith(directory + os.sep) or path.endswith(".tmp"):
+            continue
+        number = card_number_for_file(os.path.basename(path))
+        if number is not None:
+            numbers.add(number)
+    return numbers
+
+def watch(filename="unlocks.txt", jobs=1, fetch_workers=8, debounce=WATCH_DEBOUNCE,
+          force_polling=False, verbose=False):
+    """Keep cards up to date as the unlocks file and source images change
+
+    Runs until interrupted. Catalog, fonts and card templates stay loaded
+    between rebuilds (and so do the render worker processes). After a burst
+    of changes has been quiet for `debounce` seconds, only newly unlocked
+    cards and unlocked cards whose art changed are passed to generate_cards,
+    which rebuilds the ones whose inputs actually changed.
+    """
+    import file_watcher
+    
     create_directories()
+    progress = print_progress if verbose else None
+    executor = render_executor(jobs) if jobs > 1 else None
+    watcher = file_watcher.FileWatcher([filename, "images"], force_polling=force_polling)
+    try:
+        unlocked = read_unlocks_file(filename)
+        results = generate_cards(unlocked, jobs=jobs, fetch_workers=fetch_workers,
+                                 progress=progress, executor=executor)
+        print_batch_summary(results)
+        print(f"Watching {filename} and images/ ({watcher.backend}), Ctrl+C to stop")
+        
+        while True:
+            changed = watcher.wait()
+            deadline = time.monotonic() + WATCH_MAX_DELAY
+            while time.monotonic() < deadline:
+                more = watcher.wait(min(debounce, max(0.0, deadline - time.monotonic())))
+                if not more:
+                    break
+                changed |= more
+            
+            if not os.path.exists(filename):
+                continue  # mid-replace or removed: keep the last known unlocks
+            now_unlocked = read_unlocks_file(filename)
+            affected = now_unlocked - unlocked
+            art_changed = changed_card_numbers(changed)
+            affected |= now_unlocked if art_changed is None else (art_changed & now_unlocked)
+            relocked = unlocked - now_unlocked
+            unlocked = now_unlocked
+            if verbose and relocked:
+                print(f"{len(relocked)} cards were locked again (their cards are kept)")
+            if not affected:
+                continue
+            results = generate_cards(affected, jobs=jobs, fetch_workers=fetch_workers,
+                                     progress=progress, executor=executor)
+            # Art this process just downloaded shows up as a change too; that
+            # pass only finds fresh cards, so it is not worth a line
+            if verbose or any(status != "skipped" for _, _, status, _ in results):
+                print_batch_summary(results)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        if executor:
+            executor.shutdown()
+
+def print_batch_summary(results):
+    counts = {}
+    for _, _, status, _ in results:
+        counts[status] = counts.get(status, 0) + 1
+    print(f"Processed {len(results)} unlocked cards: "
+          f"{counts.get('generated', 0)} generated, "
+          f"{counts.get('skipped', 0)} skipped, "
+          f"{counts.get('failed', 0)} failed")
+
+def print_progress(result):
+    """Print a one-line progress report for a card"""
+    card_number, character_name, status, error = result
+    line = f"  #{catalog.champions.format_number(card_number)} {character_name}: {status}"
+    if error:
+        line += f" ({error})"
+    print(line)
+
+def main(argv=None):
+    """Main function to generate all trading cards"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Marvel Champions Trading Card Generator")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="number of worker processes used for rendering")
+    parser.add_argument("--fetch-workers", type=int, default=8,
+                        help="number of concurrent artwork lookups")
+    parser.add_argument("--rate", type=float, default=fetcher.DEFAULT_RATE,
+                        help="maximum requests per second to each host (0 = unlimited)")
+    parser.add_argument("--offline", metavar="PACK",
+                        help="take source art from an asset pack and never use the network")
+    parser.add_argument("--profile", choices=sorted(asset_encoding.ENCODER_PROFILES),
+                        default=asset_encoding.profile_name(),
+                        help="encoder profile for card images (fast, balanced, archive or webp)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="do not use the on-disk HTTP response cache")
+    parser.add_argument("--rebuild-secrets", action="store_true",
+                        help="regenerate all secret images and secret cards in one batch")
+    parser.add_argument("--watch", action="store_true",
+                        help="keep running and rebuild cards whenever unlocks.txt or images/ change")
+    parser.add_argument("--debounce", type=float, default=WATCH_DEBOUNCE,
+                        help="seconds of quiet that end a burst of changes in watch mode")
+    parser.add_argument("--poll", action="store_true",
+                        help="watch by polling instead of inotify (e.g. on network file systems)")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="print per-card progress, a summary and cache statistics")
+    args = parser.parse_args(argv)
+    fetcher.set_rate_limit(args.rate)
+    if args.no_cache:
+        fetcher.set_cache(None)
+    if args.offline:
+        try:
+            use_asset_pack(args.offline)
+        except ValueError as e:
+            parser.error(str(e))
+    asset_encoding.set_profile(args.profile)
+    verbose = args.verbose or args.jobs > 1
+    
+    if args.watch:
+        watch(jobs=args.jobs, fetch_workers=args.fetch_workers, debounce=args.debounce,
+              force_polling=args.poll, verbose=args.verbose)
+        return
     
     # Read which cards are unlocked
     unlocked_cards = read_unlocks_file()
@@ -669,72 +1209,29 @@ def main():
         #print("No cards are marked as unlocked. Exiting...")
         return
     
+    if args.rebuild_secrets:
+        count = rebuild_secret_assets(unlocked_cards, jobs=args.jobs)
+        if verbose:
+            print(f"Rebuilt secret assets for {count} cards")
+        return
+    
     #print("Starting Marvel Champions Trading Card Generator...")
     #print(f"Generating cards for {len(unlocked_cards)} unlocked champions...")
     
-    cards_generated = 0
-    cards_skipped_normal = 0
-    cards_skipped_secret = 0
+    progress = print_progress if verbose else None
+    results = generate_cards(unlocked_cards, jobs=args.jobs,
+                             fetch_workers=args.fetch_workers, progress=progress)
+    
+    if verbose:
+        print_batch_summary(results)
+        
+        cache = fetcher.get_cache()
+        if cache:
+            stats = cache.stats()
+            print(f"HTTP cache: {stats['hits']} hits, {stats['misses']} misses, "
+                  f"{stats['revalidations']} revalidations "
+                  f"({stats['entries']} entries, {stats['bytes'] / 1024:.0f} KiB)")
     
-    for i, champion in enumerate(champions):
-        number, character_name = parse_champion_info(champion)
-        if number and character_name:
-            card_number = int(number)
-            
-            # Only process if this card is unlocked
-            if card_number in unlocked_cards:
-                # Check if cards already exist
-                normal_exists, secret_exists = check_existing_files(card_number, character_name)
-                
-                #print(f"Processing unlocked card {cards_generated + 1}/{len(unlocked_cards)}: #{number} {character_name}")
-                
-                # Handle normal card generation
-                if normal_exists:
-                    #print(f"  Normal card already exists, skipping...")
-                    cards_skipped_normal += 1
-                    image_path = None  # We'll need to find the image for secret card generation
-                    
-                    # Try to find existing image file for secret card generation
-                    possible_extensions = ['.png', '.jpg']
-                    for ext in possible_extensions:
-                        possible_image = f"images/{card_number:03d}_{character_name.replace(' ', '_')}{ext}"
-                        if os.path.exists(possible_image):
-                            image_path = possible_image
-                            break
-                        # Also check for placeholder files
-                        possible_placeholder = f"images/{card_number:03d}_{character_name.replace(' ', '_')}_placeholder.png"
-                        if os.path.exists(possible_placeholder):
-                            image_path = possible_placeholder
-                            break
-                else:
-                    # Download image or create placeholder (only if normal card doesn't exist)
-                    image_path = download_image(character_name, card_number)
-                    
-                    # Create regular trading card
-                    create_trading_card(card_number, character_name, image_path)
-                
-                # Handle secret card generation
-                if secret_exists:
-                    #print(f"  Secret card already exists, skipping...")
-                    cards_skipped_secret += 1
-                else:
-                    # Create secret version of the image (only if secret card doesn't exist)
-                    #print(f"  Creating secret version...")
-                    secret_image_path = create_secret_image(image_path, character_name, card_number)
-                    
-                    # Create secret trading card
-                    create_secret_trading_card(card_number, character_name, secret_image_path)
-                
-                cards_generated += 1
-                
-                # Add small delay to be respectful (only if we actually downloaded something)
-                if not normal_exists or not secret_exists:
-                    time.sleep(1)
-    
-    #print("\n" + "="*50)
-    #print(f"Processed {cards_generated} unlocked cards!")
-    #print(f"Skipped {cards_skipped_normal} existing normal cards")
-    #print(f"Skipped {cards_skipped_secret} existing secret cards")
     #print("Cards saved in 'cards/' and 'cards_secret/' directories")
     #print("Images saved in 'images/' and 'images_secret/' directories")
 
@@ -0,0 +1,70 @@
+import http.server
+import os
+import sys
+import threading
+
+import pytest
+
+# The modules live flat in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class StandInServer:
+    """Local HTTP server standing in for the wiki and image hosts
+
+    `routes` maps a path prefix to (status, headers, body), or to a
+    function of (method, path) returning one; unknown paths get a 404. Every request is logged as (method, path, client port), so
+    tests can see which connections were reused.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_HEAD(self):
+                self.respond(send_body=False)
+
+            def do_GET(self):
+                self.respond(send_body=True)
+
+            def respond(self, send_body):
+                server.requests.append((self.command, self.path, self.client_address[1]))
+                status, headers, body = server.route(self.command, self.path)
+                self.send_response(status)
+                headers = dict(headers)
+                headers.setdefault("Content-Length", str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                if send_body:
+                    self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+
+    def route(self, method, path):
+        for prefix in sorted(self.routes, key=len, reverse=True):
+            if path.startswith(prefix):
+                response = self.routes[prefix]
+                return response(method, path) if callable(response) else response
+        return 404, {}, b""
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def stand_in():
+    server = StandInServer()
+    yield server
+    server.close()
@@ -0,0 +1,70 @@
+import io
+
+import pytest
+from PIL import Image
+
+import fetcher
+import subp
+import url_memo
+
+
+def png_bytes():
+    buffer = io.BytesIO()
+    Image.new("RGBA", (8, 8), (255, 0, 0, 255)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def wiki(stand_in, tmp_path, monkeypatch):
+    """Point the artwork lookup at the stand-in server, with a fresh memo"""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "images").mkdir()
+    for name in ("WIKI_BASE_URL", "STATIC_BASE_URL", "VIGNETTE_BASE_URL"):
+        monkeypatch.setattr(subp, name, stand_in.url)
+    monkeypatch.setattr(fetcher, "_cache", None)
+    monkeypatch.setattr(fetcher, "_cache_enabled", False)
+    monkeypatch.setattr(fetcher, "_rate", 0)
+    monkeypatch.setattr(fetcher, "_limiters", {})
+    monkeypatch.setattr(url_memo, "_memo", url_memo.ResolutionMemo(str(tmp_path / "memo.json")))
+    stand_in.routes["/wiki/"] = (200, {"Content-Type": "text/html"}, b"<html></html>")
+    return stand_in
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_transient_errors_are_not_remembered(wiki, status):
+    wiki.routes["/marvel-contestofchampions/"] = (status, {}, b"")
+    assert subp.search_contest_wiki_image("Drax", 21, log=lambda message: None) is None
+    memo = url_memo.get_memo()
+    assert memo.failed == {}
+    assert not memo.is_missing("Drax")
+
+
+def test_transient_wiki_page_error_is_not_remembered(wiki):
+    pytest.importorskip("bs4")
+    wiki.routes["/marvel-contestofchampions/"] = (404, {}, b"")
+    # The page exists, but fetching it to scrape the image fails for now
+    wiki.routes["/wiki/"] = lambda method, path: (200, {}, b"") if method == "HEAD" else (503, {}, b"")
+    assert subp.search_contest_wiki_image("Drax", 21, log=lambda message: None) is None
+    assert not url_memo.get_memo().is_missing("Drax")
+
+
+def test_definite_misses_are_remembered(wiki):
+    wiki.routes["/marvel-contestofchampions/"] = (404, {}, b"")
+    assert subp.search_contest_wiki_image("Drax", 21, log=lambda message: None) is None
+    memo = url_memo.get_memo()
+    assert len(memo.failed) == 3
+    assert memo.is_missing("Drax")
+
+
+def test_found_image_is_recorded(wiki):
+    wiki.routes["/marvel-contestofchampions/images/featured/"] = (200, {"Content-Type": "image/png"}, png_bytes())
+    path = subp.search_contest_wiki_image("Drax", 21, log=lambda message: None)
+    assert path and path.endswith(".png")
+    assert url_memo.get_memo().resolved_url("Drax").startswith(wiki.url)
+
+
+def test_download_reports_transient_failures(wiki):
+    wiki.routes["/busy.png"] = (503, {}, b"")
+    with pytest.raises(url_memo.TransientError):
+        subp.download_image_from_url(wiki.url + "/busy.png", "Drax", 21, log=lambda message: None)
+    assert subp.download_image_from_url(wiki.url + "/gone.png", "Drax", 21, log=lambda message: None) is None
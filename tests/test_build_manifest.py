@@ -0,0 +1,68 @@
+import hashlib
+import os
+
+from build_manifest import BuildManifest
+
+
+def test_output_is_fresh_only_for_the_same_inputs(tmp_path):
+    output = tmp_path / "card.png"
+    output.write_bytes(b"card")
+    manifest = BuildManifest(str(tmp_path / "manifest.json"))
+    inputs = {"renderer": 1, "source": "abc"}
+    assert not manifest.is_fresh(str(output), inputs)
+
+    manifest.record(str(output), inputs)
+    manifest.save()
+    reloaded = BuildManifest(str(tmp_path / "manifest.json"))
+    assert reloaded.is_fresh(str(output), dict(inputs))
+    assert not reloaded.is_fresh(str(output), {"renderer": 2, "source": "abc"})
+
+    output.unlink()
+    assert reloaded.matches(str(output), inputs)
+    assert not reloaded.is_fresh(str(output), inputs)
+
+
+def test_forget(tmp_path):
+    manifest = BuildManifest(str(tmp_path / "manifest.json"))
+    manifest.record("cards/001.png", {"renderer": 1})
+    manifest.forget("cards/001.png")
+    assert not manifest.matches("cards/001.png", {"renderer": 1})
+
+
+def test_file_hash_follows_content_changes(tmp_path):
+    source = tmp_path / "art.png"
+    source.write_bytes(b"one")
+    manifest = BuildManifest(str(tmp_path / "manifest.json"))
+    first = manifest.file_hash(str(source))
+    assert first == manifest.file_hash(str(source))
+
+    source.write_bytes(b"two")
+    st = os.stat(source)
+    os.utime(source, ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+    assert manifest.file_hash(str(source)) != first
+    assert manifest.file_hash(str(tmp_path / "missing.png")) is None
+
+
+def test_file_hash_is_cached_by_size_and_mtime(tmp_path):
+    source = tmp_path / "art.png"
+    source.write_bytes(b"one")
+    manifest = BuildManifest(str(tmp_path / "manifest.json"))
+    manifest.file_hash(str(source))
+    manifest.save()
+
+    # Same size and mtime: the stored hash is trusted without re-reading
+    st = os.stat(source)
+    source.write_bytes(b"two")
+    os.utime(source, ns=(st.st_atime_ns, st.st_mtime_ns))
+    reloaded = BuildManifest(str(tmp_path / "manifest.json"))
+    assert reloaded.file_hash(str(source)) == hashlib.sha256(b"one").hexdigest()
+
+
+def test_sharded_paths_use_their_own_file(tmp_path):
+    filename = str(tmp_path / "manifest.json")
+    manifest = BuildManifest(filename)
+    manifest.record("cards/012/12345_Name.png", {"renderer": 1})
+    manifest.record("cards/001_Name.png", {"renderer": 1})
+    manifest.save()
+    assert os.path.exists(str(tmp_path / "manifest.012.json"))
+    assert BuildManifest(filename).matches("cards/012/12345_Name.png", {"renderer": 1})
@@ -0,0 +1,50 @@
+from card_cache import CardCache
+
+
+def test_hit_and_miss_counts():
+    cache = CardCache(max_bytes=100)
+    assert cache.get((1, "normal", 1)) is None
+    cache.put((1, "normal", 1), b"x" * 10)
+    assert cache.get((1, "normal", 1)) == b"x" * 10
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["bytes"]) == (1, 1, 10)
+
+
+def test_evicts_least_recently_used_to_fit_budget():
+    cache = CardCache(max_bytes=30)
+    cache.put((1, "normal", 1), b"a" * 10)
+    cache.put((2, "normal", 1), b"b" * 10)
+    cache.put((3, "normal", 1), b"c" * 10)
+    cache.get((1, "normal", 1))  # 2 is now the least recently used
+    cache.put((4, "normal", 1), b"d" * 15)
+    assert cache.get((2, "normal", 1)) is None
+    assert cache.get((3, "normal", 1)) is None
+    assert cache.get((1, "normal", 1)) is not None
+    assert cache.bytes == 25
+    assert cache.evictions == 2
+
+
+def test_replacing_a_key_updates_its_size():
+    cache = CardCache(max_bytes=30)
+    cache.put((1, "normal", 1), b"a" * 20)
+    cache.put((1, "normal", 1), b"a" * 5)
+    assert cache.bytes == 5
+    assert cache.evictions == 0
+
+
+def test_value_larger_than_budget_is_not_cached():
+    cache = CardCache(max_bytes=10)
+    cache.put((1, "normal", 1), b"a" * 5)
+    assert not cache.put((1, "normal", 1), b"a" * 11)
+    assert cache.get((1, "normal", 1)) is None
+    assert cache.bytes == 0
+
+
+def test_invalidate_drops_every_variant_of_a_card():
+    cache = CardCache(max_bytes=100)
+    cache.put((1, "normal", 1), b"a" * 10)
+    cache.put((1, "secret", 1), b"b" * 10)
+    cache.put((2, "normal", 1), b"c" * 10)
+    cache.invalidate(1)
+    assert list(cache.entries) == [(2, "normal", 1)]
+    assert cache.bytes == 10
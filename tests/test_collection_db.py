@@ -0,0 +1,79 @@
+import pytest
+
+import collection_db
+from collection_db import CollectionDB
+from unlock_store import UnlockStore
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = CollectionDB(str(tmp_path / "collections.db"), total=20)
+    yield db
+    db.close()
+
+
+def test_bit_helpers():
+    assert collection_db.bitset_size(100) == 13
+    assert collection_db.card_bit(1) == (0, 1)
+    assert collection_db.card_bit(9) == (1, 1)
+    assert collection_db.card_bit(16) == (1, 128)
+    assert collection_db.popcount(b"\x0f\x01") == 5
+    assert collection_db.bits_to_numbers(b"\x81\x02") == [1, 8, 10]
+
+
+def test_set_and_read_cards(db):
+    assert db.set_many("alice", [1, 8, 9, 20]) == 4
+    assert db.set_many("alice", [1, 2]) == 1
+    assert db.unlocked_numbers("alice") == [1, 2, 8, 9, 20]
+    assert db.is_unlocked("alice", 9)
+    assert not db.is_unlocked("alice", 10)
+    assert db.unlocked_count("alice") == 5
+
+    assert db.set_status("alice", 9, unlocked=False)
+    assert not db.set_status("alice", 9, unlocked=False)
+    assert db.unlocked_count("alice") == 4
+    assert db.unlocked_numbers("bob") == []
+
+
+def test_rejects_out_of_range_cards(db):
+    with pytest.raises(ValueError):
+        db.set_status("alice", 21)
+    with pytest.raises(ValueError):
+        db.is_unlocked("alice", 0)
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_statistics(db, monkeypatch, use_numpy):
+    if not use_numpy:
+        monkeypatch.setattr(collection_db, "np", None)
+    elif collection_db.np is None:
+        pytest.skip("numpy is not installed")
+    db.set_many("alice", range(1, 21))
+    db.set_many("bob", [1, 2, 9])
+    db.set_many("carol", [1, 20])
+
+    counts = db.card_counts()
+    assert counts[1] == 3 and counts[2] == 2 and counts[9] == 2 and counts[20] == 2
+    assert counts[10] == 1
+    assert db.completed_users() == 1
+    assert db.completion_counts() == {20: 1, 3: 1, 2: 1}
+    assert db.rarest_cards(2) == [(3, 1), (4, 1)]
+
+
+def test_unlocks_file_round_trip(db, tmp_path):
+    source = UnlockStore(str(tmp_path / "unlocks.txt"), range(1, 21), width=3)
+    source.create()
+    source.set_many({3: "YES", 17: "YES"})
+    assert db.import_unlocks("alice", source.filename) == 2
+    assert db.unlocked_numbers("alice") == [3, 17]
+
+    exported = str(tmp_path / "alice.txt")
+    assert db.export_unlocks("alice", exported) == 2
+    assert UnlockStore(exported, range(1, 21), width=3).unlocked_numbers() == {3, 17}
+
+
+def test_import_refuses_missing_file(db, tmp_path):
+    db.set_many("alice", [1])
+    with pytest.raises(FileNotFoundError):
+        db.import_unlocks("alice", str(tmp_path / "missing.txt"))
+    assert db.unlocked_numbers("alice") == [1]
@@ -0,0 +1,91 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+import fetcher
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def session(monkeypatch):
+    """A fresh shared session and limiters, with the response cache off"""
+    monkeypatch.setattr(fetcher, "_session", None)
+    monkeypatch.setattr(fetcher, "_limiters", {})
+    monkeypatch.setattr(fetcher, "_rate", 0)
+    monkeypatch.setattr(fetcher, "_burst", fetcher.DEFAULT_BURST)
+    monkeypatch.setattr(fetcher, "_cache", None)
+    monkeypatch.setattr(fetcher, "_cache_enabled", False)
+    yield
+    if fetcher._session is not None:
+        fetcher._session.close()
+
+
+def test_fetch_all_returns_results_in_item_order(stand_in, session):
+    for n in range(8):
+        stand_in.routes[f"/{n}"] = (200, {}, str(n).encode())
+    futures = fetcher.fetch_all(lambda path: fetcher.get(stand_in.url + path).text,
+                                [(f"/{n}",) for n in range(8)], workers=4)
+    assert [future.result() for future in futures] == [str(n) for n in range(8)]
+
+
+def test_session_reuses_connections(stand_in, session):
+    stand_in.routes["/"] = (200, {}, b"ok")
+    for _ in range(10):
+        assert fetcher.get(stand_in.url + "/page").status_code == 200
+    assert len(stand_in.requests) == 10
+    assert len({port for _, _, port in stand_in.requests}) == 1
+
+
+def test_parallel_fetches_share_the_connection_pool(stand_in, session):
+    stand_in.routes["/"] = (200, {}, b"ok")
+    futures = fetcher.fetch_all(lambda path: fetcher.get(stand_in.url + path).status_code,
+                                [("/page",)] * 40, workers=4)
+    assert [future.result() for future in futures] == [200] * 40
+    assert len({port for _, _, port in stand_in.requests}) <= 4
+
+
+def test_rate_limit_paces_requests_per_host(stand_in, session):
+    stand_in.routes["/"] = (200, {}, b"ok")
+    fetcher.set_rate_limit(20, burst=2)
+    start = time.monotonic()
+    futures = fetcher.fetch_all(lambda path: fetcher.get(stand_in.url + path).status_code,
+                                [("/page",)] * 8, workers=8)
+    assert [future.result() for future in futures] == [200] * 8
+    # Two requests use the burst, the other six wait 1/20 s each
+    assert time.monotonic() - start >= 6 / 20 * 0.9
+
+
+def test_token_bucket():
+    bucket = fetcher.TokenBucket(rate=50, capacity=3)
+    start = time.monotonic()
+    for _ in range(3):
+        bucket.acquire()
+    assert time.monotonic() - start < 0.02
+    for _ in range(5):
+        bucket.acquire()
+    assert time.monotonic() - start >= 5 / 50 * 0.9
+
+    unlimited = fetcher.TokenBucket(rate=0, capacity=1)
+    start = time.monotonic()
+    for _ in range(100):
+        unlimited.acquire()
+    assert time.monotonic() - start < 0.05
+
+
+def test_artwork_lookup_uses_the_configured_wiki(stand_in, tmp_path):
+    stand_in.routes["/wiki/"] = (200, {}, b"")
+    env = dict(os.environ, MCOC_WIKI_URL=stand_in.url, MCOC_STATIC_URL=stand_in.url,
+               MCOC_VIGNETTE_URL=stand_in.url, PYTHONPATH=REPO_DIR)
+    (tmp_path / "images").mkdir()
+    code = "import subp; print(subp.search_contest_wiki_image('Drax', 21, log=lambda message: None))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "None"
+    paths = [(method, path.split("?")[0]) for method, path, _ in stand_in.requests]
+    assert ("HEAD", "/wiki/Drax") in paths
+    assert sum(path.startswith("/marvel-contestofchampions/") for _, path in paths) == 3
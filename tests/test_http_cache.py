@@ -0,0 +1,82 @@
+import os
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from http_cache import HttpCache
+
+
+def response(body, cache_control="max-age=3600", etag=None):
+    result = requests.Response()
+    result.status_code = 200
+    result._content = body
+    result.headers = CaseInsensitiveDict({"Cache-Control": cache_control})
+    if etag:
+        result.headers["ETag"] = etag
+    return result
+
+
+def offline(headers):
+    raise AssertionError("fresh entry went to the network")
+
+
+def test_fresh_hit_does_not_rewrite_the_index(tmp_path):
+    cache = HttpCache(str(tmp_path))
+    cache.get("https://example.com/a", lambda headers: response(b"a"))
+    cache.flush()
+    mtime = os.stat(cache.index_filename).st_mtime_ns
+
+    assert cache.get("https://example.com/a", offline).content == b"a"
+    assert os.stat(cache.index_filename).st_mtime_ns == mtime
+    assert cache.stats()["hits"] == 1
+
+
+def test_revalidates_stale_entries(tmp_path):
+    cache = HttpCache(str(tmp_path))
+    cache.get("https://example.com/a", lambda headers: response(b"a", "no-cache", etag='"v1"'))
+    sent = []
+
+    def not_modified(headers):
+        sent.append(headers)
+        result = requests.Response()
+        result.status_code = 304
+        return result
+
+    assert cache.get("https://example.com/a", not_modified).content == b"a"
+    assert sent[0]["If-None-Match"] == '"v1"'
+    assert cache.stats()["revalidations"] == 1
+
+
+def test_flush_merges_entries_from_other_processes(tmp_path):
+    first = HttpCache(str(tmp_path))
+    second = HttpCache(str(tmp_path))
+    first.get("https://example.com/a", lambda headers: response(b"a"))
+    second.get("https://example.com/b", lambda headers: response(b"b"))
+    first.flush()
+    second.flush()
+
+    cache = HttpCache(str(tmp_path))
+    assert cache.get("https://example.com/a", offline).content == b"a"
+    assert cache.get("https://example.com/b", offline).content == b"b"
+
+
+def test_evicts_least_recently_used_on_flush(tmp_path):
+    cache = HttpCache(str(tmp_path), max_bytes=4)
+    cache.get("https://example.com/a", lambda headers: response(b"aa"))
+    cache.get("https://example.com/b", lambda headers: response(b"bb"))
+    cache.get("https://example.com/a", offline)
+    cache.get("https://example.com/c", lambda headers: response(b"cc"))
+    cache.flush()
+    reloaded = HttpCache(str(tmp_path))
+    assert reloaded.stats()["entries"] == 2
+    assert reloaded.get("https://example.com/a", offline).content == b"aa"
+    assert not getattr(reloaded.get("https://example.com/b", lambda headers: response(b"bb")), "from_cache", False)
+
+
+def test_clear_removes_entries_and_blobs(tmp_path):
+    cache = HttpCache(str(tmp_path))
+    cache.get("https://example.com/a", lambda headers: response(b"a"))
+    cache.flush()
+    cache.clear()
+    assert HttpCache(str(tmp_path)).stats()["entries"] == 0
+    assert not any(files for _, _, files in os.walk(cache.blob_directory))
@@ -0,0 +1,61 @@
+import gzip
+import io
+import os
+
+import pytest
+import requests
+from PIL import Image
+
+import subp
+import url_memo
+
+
+def png_bytes(size=64):
+    buffer = io.BytesIO()
+    Image.effect_noise((size, size), 64).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def fetch(stand_in, path):
+    return requests.get(stand_in.url + path, stream=True, timeout=5)
+
+
+def test_valid_image_is_published(stand_in, tmp_path):
+    stand_in.routes["/art.png"] = (200, {"Content-Type": "image/png"}, png_bytes())
+    filename = str(tmp_path / "art.png")
+    assert subp.stream_image_to_file(fetch(stand_in, "/art.png"), filename) == filename
+    with Image.open(filename) as img:
+        assert img.size == (64, 64)
+    assert os.listdir(tmp_path) == ["art.png"]
+
+
+def test_gzip_encoded_image_is_accepted(stand_in, tmp_path):
+    body = gzip.compress(png_bytes())
+    stand_in.routes["/art.png"] = (200, {"Content-Type": "image/png", "Content-Encoding": "gzip"}, body)
+    filename = str(tmp_path / "art.png")
+    assert subp.stream_image_to_file(fetch(stand_in, "/art.png"), filename) == filename
+
+
+def test_truncated_body_is_transient(stand_in, tmp_path):
+    body = png_bytes()
+    headers = {"Content-Length": str(len(body) + 100), "Connection": "close"}
+    stand_in.routes["/art.png"] = (200, headers, body)
+    filename = str(tmp_path / "art.png")
+    with pytest.raises(url_memo.TransientError):
+        subp.stream_image_to_file(fetch(stand_in, "/art.png"), filename)
+    assert os.listdir(tmp_path) == []
+
+
+def test_oversized_body_is_rejected(stand_in, tmp_path):
+    body = png_bytes(256)
+    stand_in.routes["/art.png"] = (200, {"Content-Type": "image/png"}, body)
+    filename = str(tmp_path / "art.png")
+    assert subp.stream_image_to_file(fetch(stand_in, "/art.png"), filename, max_bytes=len(body) - 1) is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_non_image_is_rejected(stand_in, tmp_path):
+    stand_in.routes["/art.png"] = (200, {"Content-Type": "text/html"}, b"<html>not an image</html>")
+    filename = str(tmp_path / "art.png")
+    assert subp.stream_image_to_file(fetch(stand_in, "/art.png"), filename) is None
+    assert os.listdir(tmp_path) == []
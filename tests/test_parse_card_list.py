@@ -0,0 +1,38 @@
+import pytest
+
+from Marvel_Card_Unlock_Program import parse_card_list
+
+
+def test_single_cards_and_ranges():
+    assert parse_card_list("001,005,010-013") == [1, 5, 10, 11, 12, 13]
+
+
+def test_whitespace_separators_and_duplicates():
+    assert parse_card_list(" 3 2, 2-4\n1 ") == [1, 2, 3, 4]
+
+
+def test_single_card_range():
+    assert parse_card_list("7-7") == [7]
+
+
+def test_empty_list():
+    assert parse_card_list("  ") == []
+
+
+@pytest.mark.parametrize("text, message", [
+    ("abc", "'abc' is not a card number or range"),
+    ("5-", "'5-' is not a card number or range"),
+    ("10-3", "'10-3' is an empty range"),
+    ("99-101", "'99-101' includes unknown card 101"),
+    ("0", "'0' includes unknown card 000"),
+])
+def test_rejects_bad_entries(text, message):
+    with pytest.raises(ValueError) as excinfo:
+        parse_card_list(text)
+    assert str(excinfo.value) == message
+
+
+def test_reports_every_bad_entry():
+    with pytest.raises(ValueError) as excinfo:
+        parse_card_list("1,x,3-2,4")
+    assert str(excinfo.value) == "'x' is not a card number or range; '3-2' is an empty range"
@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+import quote_store
+from quote_store import QuoteStore
+
+QUOTES = '''\
+✔ Thing - #001 - "It's clobberin' time!"
+Hulk - #002 - "Hulk smash! Puny time."
+Groot - #003 - 
+Storm - #004 - "Feel the storm, it's time."
+'''
+
+
+@pytest.fixture
+def quotes_file(tmp_path):
+    filename = tmp_path / "quotes.py"
+    filename.write_text(QUOTES, encoding="utf-8")
+    return filename
+
+
+def test_parse_quotes(quotes_file):
+    entries = quote_store.parse_quotes(str(quotes_file))
+    assert [entry.number for entry in entries] == [1, 2, 3, 4]
+    assert entries[0].name == "Thing" and entries[0].verified
+    assert entries[2].text == "" and not entries[2].verified
+
+
+def test_lookup_by_number(quotes_file):
+    store = QuoteStore(str(quotes_file), cache_filename=None)
+    assert store.quote(2) == "Hulk smash! Puny time."
+    assert store.quote(3) == ""
+    assert store.quote(99) == ""
+    assert set(store.quotes()) == {1, 2, 4}
+
+
+def test_search_matches_every_word(quotes_file):
+    store = QuoteStore(str(quotes_file), cache_filename=None)
+    assert [entry.number for entry in store.search("time")] == [1, 2, 4]
+    assert [entry.number for entry in store.search("TIME, it's")] == [1, 4]
+    assert [entry.number for entry in store.search("clobberin")] == [1]
+    assert store.search("time nothing") == []
+    assert store.search("!!") == []
+
+
+def test_cache_is_reused_until_the_source_changes(quotes_file, tmp_path, monkeypatch):
+    cache_file = tmp_path / "quotes_cache.json"
+    QuoteStore(str(quotes_file), str(cache_file))
+    assert cache_file.exists()
+
+    def fail(filename):
+        raise AssertionError("parsed instead of loading the cache")
+
+    monkeypatch.setattr(quote_store, "parse_quotes", fail)
+    assert QuoteStore(str(quotes_file), str(cache_file)).quote(1) == "It's clobberin' time!"
+
+    monkeypatch.undo()
+    quotes_file.write_text(QUOTES + 'Loki - #005 - "Kneel."\n', encoding="utf-8")
+    st = os.stat(quotes_file)
+    os.utime(quotes_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+    assert QuoteStore(str(quotes_file), str(cache_file)).quote(5) == "Kneel."
@@ -0,0 +1,77 @@
+import unlock_store
+from unlock_store import UnlockStore
+
+
+def make_store(tmp_path, numbers=range(1, 11)):
+    store = UnlockStore(str(tmp_path / "unlocks.txt"), numbers, width=3)
+    store.create()
+    return store
+
+
+def test_create_locks_every_card(tmp_path):
+    store = make_store(tmp_path)
+    assert store.unlocked_count() == 0
+    assert len(store.statuses()) == 10
+    assert not store.create()
+
+
+def test_updates_are_appended_and_last_line_wins(tmp_path):
+    store = make_store(tmp_path)
+    assert store.set_status(3)
+    assert store.set_status("004")
+    store.set_status(3, "NO")
+    lines = open(store.filename).read().splitlines()
+    assert lines[-3:] == ["003 YES", "004 YES", "003 NO"]
+    assert UnlockStore(store.filename, range(1, 11), width=3).unlocked_numbers() == {4}
+
+
+def test_unknown_cards_and_statuses_are_ignored(tmp_path):
+    store = make_store(tmp_path)
+    assert store.set_many({11: "YES", 2: "MAYBE", "x": "YES", 5: "yes"}) == 1
+    assert store.unlocked_numbers() == {5}
+
+
+def test_torn_final_line_is_ignored(tmp_path):
+    store = make_store(tmp_path)
+    store.set_status(7)
+    with open(store.filename, "a") as f:
+        f.write("008 YE")  # crash in the middle of an append
+    fresh = UnlockStore(store.filename, range(1, 11), width=3)
+    assert fresh.unlocked_numbers() == {7}
+    assert fresh.get(8) == "NO"
+
+    # The next append starts on a new line instead of extending the torn one
+    fresh.set_status(9)
+    assert UnlockStore(store.filename, range(1, 11), width=3).unlocked_numbers() == {7, 9}
+
+
+def test_narrower_numbers_still_load(tmp_path):
+    filename = tmp_path / "unlocks.txt"
+    filename.write_text("1 YES\n02 NO\n10 YES\n")
+    store = UnlockStore(str(filename), range(1, 11), width=3)
+    assert store.unlocked_numbers() == {1, 10}
+    assert store.is_unlocked("001")
+
+
+def test_compacts_after_too_many_journal_lines(tmp_path, monkeypatch):
+    monkeypatch.setattr(unlock_store, "COMPACT_AFTER", 4)
+    store = make_store(tmp_path)
+    for status in ("YES", "NO", "YES", "NO"):
+        store.set_status(1, status)
+    assert len(open(store.filename).read().splitlines()) == 14
+
+    store.set_status(2)
+    lines = open(store.filename).read().splitlines()
+    assert len(lines) == 10
+    assert lines[0] == "001 NO" and lines[1] == "002 YES"
+    assert store.unlocked_numbers() == {2}
+
+
+def test_compact_keeps_state(tmp_path):
+    store = make_store(tmp_path)
+    store.set_many({1: "YES", 5: "YES"})
+    store.set_status(1, "NO")
+    store.compact()
+    lines = open(store.filename).read().splitlines()
+    assert len(lines) == 10 and "005 YES" in lines
+    assert store.unlocked_numbers() == {5}
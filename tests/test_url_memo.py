@@ -0,0 +1,50 @@
+import time
+
+import url_memo
+from url_memo import ResolutionMemo
+
+
+def test_definite_misses():
+    assert url_memo.is_definite_miss(404)
+    assert url_memo.is_definite_miss(410)
+    assert not url_memo.is_definite_miss(429)
+    assert not url_memo.is_definite_miss(503)
+
+
+def test_resolved_urls_persist(tmp_path):
+    filename = str(tmp_path / "memo.json")
+    memo = ResolutionMemo(filename)
+    memo.mark_failed("https://example.com/a.png")
+    memo.mark_missing("Thing")
+    memo.record("Thing", "https://example.com/a.png")
+    assert not memo.is_failed("https://example.com/a.png")
+    assert not memo.is_missing("Thing")
+
+    reloaded = ResolutionMemo(filename)
+    assert reloaded.resolved_url("Thing") == "https://example.com/a.png"
+    reloaded.forget("Thing")
+    assert ResolutionMemo(filename).resolved_url("Thing") is None
+
+
+def test_negative_entries_expire(tmp_path, monkeypatch):
+    filename = str(tmp_path / "memo.json")
+    memo = ResolutionMemo(filename)
+    memo.mark_failed("https://example.com/a.png", ttl=60)
+    memo.mark_missing("Hulk", ttl=120)
+    assert memo.is_failed("https://example.com/a.png")
+    assert memo.is_missing("Hulk")
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 90)
+    assert not memo.is_failed("https://example.com/a.png")
+    assert memo.is_missing("Hulk")
+    assert ResolutionMemo(filename).failed == {}
+
+
+def test_default_ttls(tmp_path):
+    memo = ResolutionMemo(str(tmp_path / "memo.json"))
+    before = time.time()
+    memo.mark_failed("https://example.com/a.png")
+    memo.mark_missing("Hulk")
+    assert memo.failed["https://example.com/a.png"] >= before + url_memo.FAILED_URL_TTL
+    assert memo.missing["Hulk"] >= before + url_memo.MISSING_ART_TTL
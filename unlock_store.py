@@ -0,0 +1,213 @@
+import os
+from contextlib import contextmanager
+
+import catalog
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Number of appended journal lines allowed before the file is compacted
+COMPACT_AFTER = 64
+
+VALID_STATUSES = ("YES", "NO")
+
+
+class UnlockStore:
+    """Crash-safe, lock-protected view of the unlocks.txt collection file
+
+    The file keeps its familiar "NNN YES/NO" layout. Updates are appended as
+    journal lines (the last line for a card wins) so a write is a single small
+    append instead of a full rewrite, and the file is periodically compacted
+    with an atomic replace. A torn final line left by a crash is ignored.
+
+    The parsed state is cached in memory and only reloaded when the file's
+    mtime or size changes, so repeated reads cost nothing.
+
+    Cards are the catalog's numbers unless `numbers` is given. Methods take
+    a card number as an int or a digit string; numbers are written with the
+    catalog's width, and files written with a narrower width still load.
+    """
+
+    def __init__(self, filename="unlocks.txt", numbers=None, width=None):
+        self.filename = filename
+        self.lock_filename = filename + ".lock"
+        self.numbers = set(catalog.champions.numbers() if numbers is None else numbers)
+        self.width = width or catalog.champions.width
+        self._unlocks = {}
+        self._unlocked_count = 0
+        self._line_count = 0
+        self._ends_with_newline = True
+        self._stat_key = None
+
+    def exists(self):
+        return os.path.exists(self.filename)
+
+    def create(self):
+        """Create the file with every card locked (if it does not exist yet)"""
+        with self._locked():
+            if os.path.exists(self.filename):
+                return False
+            self._write_atomic(self._initial_unlocks())
+            return True
+
+    def refresh(self):
+        """Reload the cached state if the file changed on disk"""
+        try:
+            st = os.stat(self.filename)
+        except FileNotFoundError:
+            self._load_lines([], True)
+            self._stat_key = None
+            return
+        key = (st.st_mtime_ns, st.st_size)
+        if key != self._stat_key:
+            self._load()
+
+    def statuses(self):
+        """Return a copy of the card number -> status mapping"""
+        self.refresh()
+        return dict(self._unlocks)
+
+    def key(self, card_number):
+        """Canonical file key of a card number (int or digit string), or None"""
+        try:
+            return f"{int(card_number):0{self.width}d}"
+        except (TypeError, ValueError):
+            return None
+
+    def get(self, card_number, default="NO"):
+        self.refresh()
+        return self._unlocks.get(self.key(card_number), default)
+
+    def is_unlocked(self, card_number):
+        return self.get(card_number) == "YES"
+
+    def unlocked_count(self):
+        self.refresh()
+        return self._unlocked_count
+
+    def unlocked_numbers(self):
+        """Return the set of unlocked card numbers as ints"""
+        self.refresh()
+        return {int(num) for num, status in self._unlocks.items() if status == "YES"}
+
+    def set_status(self, card_number, status="YES"):
+        """Set the status of a single card, returns False for unknown cards"""
+        return self.set_many({card_number: status}) == 1
+
+    def set_many(self, updates):
+        """Apply several status updates in one locked append
+
+        Returns the number of known cards that were updated.
+        """
+        with self._locked():
+            if not os.path.exists(self.filename):
+                self._write_atomic(self._initial_unlocks())
+            self.refresh()
+
+            lines = []
+            applied = {}
+            for card_number, status in updates.items():
+                status = status.upper()
+                card_num = self.key(card_number)
+                if status not in VALID_STATUSES or card_num is None:
+                    continue
+                if card_num not in self._unlocks and int(card_num) not in self.numbers:
+                    continue
+                applied[card_num] = status
+                lines.append(f"{card_num} {status}\n")
+
+            if lines:
+                prefix = "" if self._ends_with_newline else "\n"
+                with open(self.filename, "a") as f:
+                    f.write(prefix + "".join(lines))
+                    f.flush()
+                    os.fsync(f.fileno())
+                for card_num, status in applied.items():
+                    self._apply(card_num, status)
+                self._line_count += len(lines)
+                self._ends_with_newline = True
+                self._remember_stat()
+
+                if self._line_count > len(self._unlocks) + COMPACT_AFTER:
+                    self._write_atomic(self._unlocks)
+
+            return len(applied)
+
+    def compact(self):
+        """Rewrite the file with one line per card"""
+        with self._locked():
+            self.refresh()
+            self._write_atomic(self._unlocks)
+
+    def _initial_unlocks(self):
+        return {self.key(number): "NO" for number in self.numbers}
+
+    def _apply(self, card_num, status):
+        previous = self._unlocks.get(card_num)
+        if previous == "YES":
+            self._unlocked_count -= 1
+        if status == "YES":
+            self._unlocked_count += 1
+        self._unlocks[card_num] = status
+
+    def _load(self):
+        try:
+            with open(self.filename, "r") as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = ""
+        ends_with_newline = data == "" or data.endswith("\n")
+        lines = data.split("\n")
+        if not ends_with_newline:
+            # Torn write from a crash, ignore the partial line
+            lines = lines[:-1]
+        self._load_lines(lines, ends_with_newline)
+        self._remember_stat()
+
+    def _load_lines(self, lines, ends_with_newline):
+        self._unlocks = {}
+        self._unlocked_count = 0
+        self._line_count = 0
+        for line in lines:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].upper() in VALID_STATUSES and parts[0].isdigit():
+                self._apply(self.key(parts[0]), parts[1].upper())
+                self._line_count += 1
+        self._ends_with_newline = ends_with_newline
+
+    def _remember_stat(self):
+        try:
+            st = os.stat(self.filename)
+            self._stat_key = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            self._stat_key = None
+
+    def _write_atomic(self, unlocks):
+        tmp_filename = f"{self.filename}.{os.getpid()}.tmp"
+        with open(tmp_filename, "w") as f:
+            for card_num in sorted(unlocks, key=int):
+                f.write(f"{card_num} {unlocks[card_num]}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_filename, self.filename)
+        self._load()
+
+    @contextmanager
+    def _locked(self):
+        with open(self.lock_filename, "a+") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
@@ -0,0 +1,118 @@
+import json
+import os
+import threading
+import time
+
+DEFAULT_MEMO_FILE = ".url_resolutions.json"
+
+# How long a failed image URL pattern is skipped before being retried
+FAILED_URL_TTL = 7 * 24 * 3600
+
+# How long a champion with no art anywhere goes straight to a placeholder
+MISSING_ART_TTL = 24 * 3600
+
+# Responses that prove a URL has no art. Anything else (429, 5xx, timeouts)
+# may be transient and is never cached.
+MISS_STATUSES = (404, 410)
+
+
+def is_definite_miss(status_code):
+    return status_code in MISS_STATUSES
+
+
+class TransientError(Exception):
+    """A lookup failed in a way that may work on retry (timeout, 429, 5xx, cut-off body)"""
+
+
+class ResolutionMemo:
+    """Persistent record of which artwork URLs work for each champion
+
+    `resolved` maps a champion to the URL that last produced a valid image,
+    so later lookups are a single request. `failed` and `missing` are
+    negative caches with expiry times: image URLs that returned 404/410 or
+    no decodable image, and champions whose wiki page or art is gone.
+    """
+
+    def __init__(self, filename=DEFAULT_MEMO_FILE):
+        self.filename = filename
+        self.lock = threading.Lock()
+        self.resolved = {}
+        self.failed = {}
+        self.missing = {}
+        self._load()
+
+    def resolved_url(self, character_name):
+        with self.lock:
+            return self.resolved.get(character_name)
+
+    def record(self, character_name, url):
+        """Remember a URL that produced a valid image"""
+        with self.lock:
+            self.resolved[character_name] = url
+            self.failed.pop(url, None)
+            self.missing.pop(character_name, None)
+            self._save()
+
+    def forget(self, character_name):
+        with self.lock:
+            if self.resolved.pop(character_name, None):
+                self._save()
+
+    def is_failed(self, url):
+        with self.lock:
+            return _active(self.failed, url)
+
+    def mark_failed(self, url, ttl=FAILED_URL_TTL):
+        with self.lock:
+            self.failed[url] = time.time() + ttl
+            self._save()
+
+    def is_missing(self, character_name):
+        with self.lock:
+            return _active(self.missing, character_name)
+
+    def mark_missing(self, character_name, ttl=MISSING_ART_TTL):
+        with self.lock:
+            self.missing[character_name] = time.time() + ttl
+            self._save()
+
+    def _load(self):
+        try:
+            with open(self.filename, "r") as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        now = time.time()
+        self.resolved = data.get("resolved", {})
+        self.failed = {k: v for k, v in data.get("failed", {}).items() if v > now}
+        self.missing = {k: v for k, v in data.get("missing", {}).items() if v > now}
+
+    def _save(self):
+        data = {"resolved": self.resolved, "failed": self.failed, "missing": self.missing}
+        tmp_filename = f"{self.filename}.{os.getpid()}.tmp"
+        with open(tmp_filename, "w") as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        os.replace(tmp_filename, self.filename)
+
+
+def _active(entries, key):
+    expires = entries.get(key)
+    if expires is None:
+        return False
+    if expires <= time.time():
+        del entries[key]
+        return False
+    return True
+
+
+_memo = None
+_memo_lock = threading.Lock()
+
+
+def get_memo():
+    """Return the shared resolution memo"""
+    global _memo
+    with _memo_lock:
+        if _memo is None:
+            _memo = ResolutionMemo()
+        return _memo